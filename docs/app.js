@@ -1,5 +1,8 @@
 let DATA = null;
 let TEAMS = [];
+let LEAGUE = null;   // decoded league.json: { teams, byKey }
+let LEAGUE_FILE = null;
+let MANIFEST = null; // manifest.json: key -> immutable content-hashed file name
 
 // -------------------- helpers --------------------
 function pct(x) {
@@ -36,24 +39,107 @@ function isoNow() {
   return new Date().toISOString();
 }
 
-// Snapshot storage
-function snapshotKey(team, season, week, opp) {
-  return `oracleSnap|${safeText(season)}|${safeText(team)}|wk${safeText(week)}|${safeText(opp)}`;
-}
+// -------------------- Weekly archive (docs/archive/<season>/) --------------------
+// What the oracle said at each week boundary, kept by the builder. Versions
+// are append-only and their files never change, so only index.json is fetched
+// uncached; the latest view is cached in localStorage and brought up to date
+// with just the deltas published since.
+let ARCHIVE = null;          // { season, index, version, teams }
+const ARCHIVE_FILES = {};    // "<season>/<file>" -> parsed JSON
 
-function saveSnapshot(key, payload) {
-  try { localStorage.setItem(key, JSON.stringify(payload)); } catch {}
+function archiveCacheKey(season) {
+  return `oracleArchive|${safeText(season)}`;
 }
 
-function loadSnapshot(key) {
+function loadArchiveCache(season) {
   try {
-    const raw = localStorage.getItem(key);
+    const raw = localStorage.getItem(archiveCacheKey(season));
     return raw ? JSON.parse(raw) : null;
   } catch {
     return null;
   }
 }
 
+function saveArchiveCache(season, payload) {
+  try { localStorage.setItem(archiveCacheKey(season), JSON.stringify(payload)); } catch {}
+}
+
+async function fetchArchiveFile(season, name) {
+  const k = `${season}/${name}`;
+  if (!ARCHIVE_FILES[k]) {
+    const res = await fetch(`./archive/${season}/${name}`);
+    if (!res.ok) throw new Error(`archive ${name} failed (${res.status})`);
+    ARCHIVE_FILES[k] = await res.json();
+  }
+  return ARCHIVE_FILES[k];
+}
+
+// Mirrors build_data.py _apply_archive_delta (mutates teams)
+function applyArchiveDelta(teams, delta) {
+  Object.entries(delta).forEach(([t, d]) => {
+    const cur = teams[t] || (teams[t] = { summary: null, games: [] });
+    const games = new Map(cur.games.map(g => [g.week, g]));
+    (d.removed || []).forEach(w => games.delete(w));
+    (d.games || []).forEach(gd => {
+      const g = Object.assign({}, games.get(gd.week) || {});
+      Object.entries(gd).forEach(([k, v]) => { if (k !== "oracle") g[k] = v; });
+      if (gd.oracle) g.oracle = Object.assign({}, g.oracle || {}, gd.oracle);
+      games.set(gd.week, g);
+    });
+    cur.games = [...games.keys()].sort((a, b) => a - b).map(w => games.get(w));
+    if ("summary" in d) cur.summary = d.summary;
+  });
+  return teams;
+}
+
+// Nearest full snapshot at or before the last version, then the deltas after it
+async function archiveFromFull(season, versions) {
+  let start = versions.length - 1;
+  while (start > 0 && !versions[start].full) start--;
+  const full = await fetchArchiveFile(season, versions[start].full);
+  const teams = JSON.parse(JSON.stringify(full.teams));
+  for (const v of versions.slice(start + 1)) {
+    applyArchiveDelta(teams, (await fetchArchiveFile(season, v.delta)).teams);
+  }
+  return teams;
+}
+
+async function syncArchive(season) {
+  try {
+    const res = await fetch(`./archive/${season}/index.json`, { cache: "no-store" });
+    if (!res.ok) return null;
+    const index = await res.json();
+    const versions = index.versions || [];
+    if (!versions.length) return null;
+    const latest = versions[versions.length - 1].version;
+
+    const local = (ARCHIVE && ARCHIVE.season === season) ? ARCHIVE : loadArchiveCache(season);
+    let teams;
+    if (local && local.version <= latest) {
+      teams = local.teams;
+      for (const v of versions.filter(v => v.version > local.version)) {
+        applyArchiveDelta(teams, (await fetchArchiveFile(season, v.delta)).teams);
+      }
+    } else {
+      teams = await archiveFromFull(season, versions);
+    }
+    if (!local || local.version !== latest) saveArchiveCache(season, { version: latest, teams });
+    ARCHIVE = { season, index, version: latest, teams };
+    return ARCHIVE;
+  } catch (e) {
+    console.warn("archive sync failed", e);
+    return null;
+  }
+}
+
+async function archiveAsOf(season, week) {
+  if (!ARCHIVE || ARCHIVE.season !== season) return null;
+  const versions = ARCHIVE.index.versions.filter(v => v.week <= week);
+  if (!versions.length) return null;
+  if (versions.length === ARCHIVE.index.versions.length) return ARCHIVE.teams;
+  return archiveFromFull(season, versions);
+}
+
 // -------------------- Rams + alias fallback --------------------
 const TEAM_KEY_FALLBACKS = {
   "lar": ["la", "LA"],
@@ -63,13 +149,33 @@ const TEAM_KEY_FALLBACKS = {
   "was": ["wsh"],
 };
 
+// -------------------- Manifest + content-hashed files --------------------
+// Only manifest.json is fetched uncached; the hashed names it points to
+// (gb.<hash>.json) never change content, so the browser cache can keep them.
+async function loadManifest() {
+  try {
+    const res = await fetch("./manifest.json", { cache: "no-store" });
+    MANIFEST = res.ok ? await res.json() : null;
+  } catch {
+    MANIFEST = null;
+  }
+  return MANIFEST;
+}
+
+function hashedFile(key) {
+  return (MANIFEST && MANIFEST.files && MANIFEST.files[key]) || null;
+}
+
 async function fetchTeamJsonWithFallback(teamKey) {
   const keys = [teamKey].concat(TEAM_KEY_FALLBACKS[teamKey] || []);
   let lastErr = null;
 
   for (const k of keys) {
     try {
-      const res = await fetch(`./${k}.json`, { cache: "no-store" });
+      const file = hashedFile(k);
+      const res = file
+        ? await fetch(`./${file}`)
+        : await fetch(`./${k}.json`, { cache: "no-store" });
       if (!res.ok) throw new Error(`Fetch failed for ${k}.json (${res.status})`);
       return { data: await res.json(), usedKey: k };
     } catch (e) {
@@ -79,6 +185,64 @@ async function fetchTeamJsonWithFallback(teamKey) {
   throw lastErr || new Error("All team fetches failed");
 }
 
+// -------------------- League bundle (whole league in one request) --------------------
+function decodeLeagueBundle(b) {
+  const cell = (f, i) => {
+    const c = b.columns[f];
+    const v = c.data[i];
+    if (v === null || v === undefined) return null;
+    if (c.enc === "str") return b.strings[v];
+    if (c.enc === "obj") return b.objects[v];
+    return v;
+  };
+
+  const teams = [];
+  const byKey = {};
+  b.teams.forEach(t => {
+    const games = [];
+    for (let i = t.start; i < t.start + t.count; i++) {
+      const g = {};
+      b.fields.forEach(f => {
+        if (f.startsWith("oracle.")) {
+          (g.oracle = g.oracle || {})[f.slice(7)] = cell(f, i);
+        } else {
+          g[f] = cell(f, i);
+        }
+      });
+      games.push(g);
+    }
+    teams.push({ team: b.strings[t.team], key: t.key });
+    byKey[t.key] = { summary: t.summary, simulation: t.simulation ?? null, generated_at: b.generated_at, games };
+  });
+  return { teams, byKey };
+}
+
+async function loadLeague() {
+  const file = MANIFEST && MANIFEST.league;
+  if (file && file === LEAGUE_FILE && LEAGUE) return true;   // unchanged since last load
+  try {
+    const res = file
+      ? await fetch(`./${file}`)
+      : await fetch("./league.json", { cache: "no-store" });
+    if (!res.ok) return false;
+    LEAGUE = decodeLeagueBundle(await res.json());
+    LEAGUE_FILE = file || null;
+    return true;
+  } catch {
+    LEAGUE = null;
+    return false;
+  }
+}
+
+function teamFromLeague(teamKey) {
+  if (!LEAGUE) return null;
+  const keys = [teamKey].concat(TEAM_KEY_FALLBACKS[teamKey] || []);
+  for (const k of keys) {
+    if (LEAGUE.byKey[k]) return { data: LEAGUE.byKey[k], usedKey: k };
+  }
+  return null;
+}
+
 // -------------------- UI renderers --------------------
 function populateTeamDropdown() {
   const sel = document.getElementById("team");
@@ -150,6 +314,24 @@ function renderNextGame() {
     Lean: ${pick}<br>
     Win prob: ${pct(pwin)}<br>
     Confidence: ${Math.round(conf)}/100
+  ` + renderOutlook(DATA.simulation);
+}
+
+function renderOutlook(sim) {
+  // Monte Carlo rest-of-season odds (build_data.py simulate_season)
+  if (!sim) return "";
+  const likely = Object.entries(sim.record || {})
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, 3)
+    .map(([rec, p]) => `${rec} (${pct(p)})`)
+    .join(", ");
+  return `
+    <hr>
+    <b>Rest of season</b> (${sim.runs.toLocaleString()} sims, ${sim.games_left} games left)<br>
+    Expected wins: ${sim.expected_wins}<br>
+    Most likely: ${likely}<br>
+    Win ${sim.division}: ${pct(sim.division_title)}<br>
+    Make playoffs: ${pct(sim.playoffs)}
   `;
 }
 
@@ -160,6 +342,18 @@ function renderGame(g) {
 
 // -------------------- loaders --------------------
 async function loadTeams() {
+  await loadManifest();
+  if (await loadLeague()) {
+    TEAMS = LEAGUE.teams;
+    populateTeamDropdown();
+    return;
+  }
+  if (MANIFEST && MANIFEST.teams) {
+    TEAMS = MANIFEST.teams;
+    populateTeamDropdown();
+    return;
+  }
+
   const res = await fetch("./teams.json", { cache: "no-store" });
   if (!res.ok) throw new Error("teams.json failed");
   const payload = await res.json();
@@ -167,15 +361,54 @@ async function loadTeams() {
   populateTeamDropdown();
 }
 
-async function loadTeam(teamKey) {
+async function loadTeam(teamKey, resyncArchive = false) {
   const status = document.getElementById("status");
   status.textContent = "Loading…";
 
-  const { data, usedKey } = await fetchTeamJsonWithFallback(teamKey);
-  DATA = data;
+  const fromLeague = teamFromLeague(teamKey);
+  const { data, usedKey } = fromLeague || await fetchTeamJsonWithFallback(teamKey);
+  CURRENT = data;
+
+  status.textContent = fromLeague
+    ? `Loaded ${data.summary.team} (${LEAGUE_FILE || "league.json"})`
+    : `Loaded ${data.summary.team} (${usedKey}.json)`;
 
-  status.textContent = `Loaded ${DATA.summary.team} (${usedKey}.json)`;
+  await populateAsOf(data.summary.season, resyncArchive);
+  showTeamData(data);
+}
+
+// -------------------- "As of" archived views --------------------
+let CURRENT = null;   // latest payload for the selected team
 
+async function populateAsOf(season, resync = false) {
+  const sel = document.getElementById("asof");
+  if (!sel) return;
+  if (resync || !ARCHIVE || ARCHIVE.season !== season) await syncArchive(season);
+  sel.innerHTML = "";
+  const latest = document.createElement("option");
+  latest.value = "";
+  latest.textContent = "Latest";
+  sel.appendChild(latest);
+  (ARCHIVE && ARCHIVE.season === season ? ARCHIVE.index.versions : []).slice().reverse().forEach(v => {
+    const opt = document.createElement("option");
+    opt.value = v.week;
+    opt.textContent = v.week === 0 ? "Preseason" : `After week ${v.week}`;
+    sel.appendChild(opt);
+  });
+  sel.value = "";
+}
+
+async function showAsOf(week) {
+  if (week === "" || !CURRENT) return showTeamData(CURRENT);
+  const teams = await archiveAsOf(CURRENT.summary.season, Number(week));
+  const view = teams && teams[CURRENT.summary.team];
+  if (!view) return showTeamData(CURRENT);
+  // archived views carry no simulation block
+  showTeamData({ summary: view.summary, games: view.games, generated_at: null });
+}
+
+function showTeamData(data) {
+  DATA = data;
   document.getElementById("summary").textContent =
     JSON.stringify(DATA.summary, null, 2);
 
@@ -205,7 +438,13 @@ async function boot() {
 
   teamSel.addEventListener("change", e => loadTeam(e.target.value));
   document.getElementById("refresh")
-    .addEventListener("click", () => loadTeam(teamSel.value));
+    .addEventListener("click", async () => {
+      await loadManifest();
+      if (LEAGUE) await loadLeague();
+      await loadTeam(teamSel.value, true);
+    });
+  const asOfSel = document.getElementById("asof");
+  if (asOfSel) asOfSel.addEventListener("change", e => showAsOf(e.target.value));
 
   await loadTeam(defaultKey);
 }
@@ -0,0 +1,299 @@
+"""
+Parameter-sweep backtest for the pregame oracle in scripts/build_data.py.
+
+Replays the requested seasons once into per-team-game feature and result
+arrays (point differential per game plus recent form for every form window
+in the grid), then scores a grid of
+
+    bucket step  x  form window  x  confidence curve  x  pick threshold
+
+against what actually happened. Each (step, window) pair is one pass of the
+production BucketLibrary through the seasons in a process pool; all the
+confidence curves and thresholds for that pair are evaluated together as
+batched NumPy over the resulting reads.
+
+    python scripts/backtest.py --seasons 2015-2024
+    python scripts/backtest.py --seasons 2024 --offline --rank log_loss
+    python scripts/backtest.py --seasons 2000-2024 --steps 2 3 4 --form-windows 2 3 4
+
+Metrics per configuration (over played team-games, both sides of each game):
+  - coverage: share of games with a pick (a library read at or above the threshold)
+  - hit_rate: picks that matched the result (ties never match, as in reality_lock)
+  - brier / log_loss: of pregame_expected_win_rate vs the result (T = 0.5), over picks
+  - calibration_score: MATCH - DIVERGE over picks, i.e. the league total of
+    the per-team calibration_score the build writes
+
+Rankings skip configurations that pick fewer than --min-coverage of games
+(a handful of high-confidence picks can look perfect on their own).
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import build_data as bd
+
+DEFAULT_OUT = bd.CACHE_DIR / "backtest.json"
+
+STEPS = (2, 3, 4, 5, 6)
+FORM_WINDOWS = (1, 2, 3, 4, 5, 6)
+SAMPLE_NS = (6, 12, 24, 48)
+FLOORS = (0.0, 0.15, 0.3)
+MIN_CONFS = (0, 50, 60, 70)
+
+# The build's current settings (make_bucket / team_stats_before_week / pregame_confidence)
+CURRENT = {"step": 3, "form_window": 3, "sample_n": 12, "floor": 0.15, "min_conf": 0}
+
+RANK_KEYS = {"brier": False, "log_loss": False, "hit_rate": True, "calibration_score": True}
+LOG_LOSS_EPS = 1e-6
+
+# ------------------------- Replay once into arrays -------------------------
+
+def _season_features_job(season, offline, fixture, form_windows):
+    """
+    Process-pool worker: walk one season's weeks with fresh team histories and
+    return arrays over its played team-games (home then away, schedule order):
+    week, is_home, pdpg, opp_pdpg, result index, and form / opp_form of
+    shape (len(form_windows), m).
+    """
+    sched = bd.load_schedule(season, offline=offline, fixture=fixture)
+    sched, home_col, away_col, all_teams = bd._prepare_schedule(sched)
+    hist = {t: bd.TeamHistory() for t in all_teams}
+
+    rows = []
+    for week, batch in bd._week_batches(sched, home_col, away_col):
+        played_games = []
+        for home, away, hs, aw in zip(batch["home"].tolist(), batch["away"].tolist(), batch["hs"].tolist(), batch["as"].tolist()):
+            if np.isnan(hs) or np.isnan(aw):
+                continue
+            hs, aw = int(hs), int(aw)
+            home_stats = [hist[home].stats_before(week, k) for k in form_windows]
+            away_stats = [hist[away].stats_before(week, k) for k in form_windows]
+            home_res = 0 if hs > aw else 1 if hs < aw else 2
+            away_res = {0: 1, 1: 0, 2: 2}[home_res]
+            rows.append((week, 1, home_stats, away_stats, home_res))
+            rows.append((week, 0, away_stats, home_stats, away_res))
+            played_games.append((home, away, hs, aw))
+        for home, away, hs, aw in played_games:
+            hist[home].append(week, hs, aw)
+            hist[away].append(week, aw, hs)
+
+    return season, {
+        "week": np.array([r[0] for r in rows], dtype=np.int64),
+        "is_home": np.array([r[1] for r in rows], dtype=np.int64),
+        "pdpg": np.array([r[2][0]["pdpg"] for r in rows], dtype=float),
+        "opp_pdpg": np.array([r[3][0]["pdpg"] for r in rows], dtype=float),
+        "form": np.array([[s["form"] for s in r[2]] for r in rows], dtype=float).reshape(-1, len(form_windows)).T,
+        "opp_form": np.array([[s["form"] for s in r[3]] for r in rows], dtype=float).reshape(-1, len(form_windows)).T,
+        "result": np.array([r[4] for r in rows], dtype=np.int64),
+    }
+
+def replay_features(seasons, offline=False, fixture=None, form_windows=FORM_WINDOWS, pool=None):
+    """
+    Concatenate per-season feature arrays in chronological order. "slot"
+    numbers the (season, week) batches so the library fold can walk them.
+    """
+    jobs = [(s, offline, fixture, tuple(form_windows)) for s in sorted(seasons)]
+    if pool is None:
+        parts = [_season_features_job(*j) for j in jobs]
+    else:
+        parts = [f.result() for f in [pool.submit(_season_features_job, *j) for j in jobs]]
+
+    feats = {k: [] for k in ("slot", "is_home", "pdpg", "opp_pdpg", "form", "opp_form", "result")}
+    slot_base = 0
+    for _, part in parts:
+        _, slot = np.unique(part["week"], return_inverse=True)
+        feats["slot"].append(slot + slot_base)
+        slot_base += int(slot.max()) + 1 if len(slot) else 0
+        for k in ("is_home", "pdpg", "opp_pdpg", "form", "opp_form", "result"):
+            feats[k].append(part[k])
+    out = {k: np.concatenate(v, axis=-1) for k, v in feats.items()}
+    out["form_windows"] = tuple(form_windows)
+    return out
+
+# ------------------------- Library pass + batched scoring -------------------------
+
+def library_reads(feats, step, form_window):
+    """
+    One chronological pass of a fresh BucketLibrary with bucket width `step`
+    and form window `form_window`: every team-game reads the library built
+    from earlier weeks only, then the week's results are added.
+    Returns (p_win, n); p_win is NaN where the library had nothing.
+    """
+    k = feats["form_windows"].index(form_window)
+    buckets = np.stack([
+        feats["is_home"],
+        np.floor(feats["pdpg"] / step),
+        np.floor(feats["opp_pdpg"] / step),
+        np.floor(feats["form"][k] / step),
+        np.floor(feats["opp_form"][k] / step),
+    ], axis=1).astype(np.int64)
+    results = np.array(bd.RESULTS)[feats["result"]]
+
+    library = bd.BucketLibrary()
+    counts = np.zeros((len(buckets), len(bd.RESULTS)), dtype=np.int64)
+    bounds = np.flatnonzero(np.diff(feats["slot"])) + 1
+    for idx in np.split(np.arange(len(buckets)), bounds):
+        if len(idx) == 0:
+            continue
+        counts[idx], _ = library.lookup_many(buckets[idx])
+        library.update_many(buckets[idx], results[idx])
+
+    n = counts.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # same rounding as the hist_norm shares the build reads p_win from
+        p = np.round(counts[:, 0] / n, 3) + 0.5 * np.round(counts[:, 2] / n, 3)
+    return p, n
+
+def confidence_many(p, n, sample_n, floor):
+    """pregame_confidence over arrays; broadcasts sample_n / floor against p."""
+    strength = np.minimum(1.0, np.abs(p - 0.5) * 2.0)
+    sample = np.log1p(n) / np.log1p(sample_n)
+    return np.clip(35 + 65 * (floor + (1 - floor) * strength) * sample, 0, 100)
+
+def score_reads(p, n, result, sample_ns=SAMPLE_NS, floors=FLOORS, min_confs=MIN_CONFS):
+    """
+    Metrics for every (sample_n, floor, min_conf) at once. Returns a list of
+    dicts in that grid order.
+    """
+    has_read = n > 0
+    outcome = np.array([1.0, 0.0, 0.5])[result]
+    pick_win = p >= 0.5
+    hit = np.where(pick_win, result == 0, result == 1) & has_read
+    p_safe = np.where(has_read, p, 0.5)
+    brier = (p_safe - outcome) ** 2
+    pc = np.clip(p_safe, LOG_LOSS_EPS, 1 - LOG_LOSS_EPS)
+    log_loss = -(outcome * np.log(pc) + (1 - outcome) * np.log(1 - pc))
+
+    sn = np.asarray(sample_ns, dtype=float)[:, None, None, None]
+    fl = np.asarray(floors, dtype=float)[None, :, None, None]
+    mc = np.asarray(min_confs, dtype=float)[None, None, :, None]
+    conf = confidence_many(p_safe[None, None, None, :], n[None, None, None, :], sn, fl)
+    picked = has_read & (conf >= mc)                           # (S, F, T, m)
+
+    n_pick = picked.sum(axis=-1)
+    n_hit = (picked & hit).sum(axis=-1)
+    sum_brier = picked.astype(float) @ brier
+    sum_ll = picked.astype(float) @ log_loss
+    total = len(result)
+
+    rows = []
+    for i, s in enumerate(sample_ns):
+        for j, f in enumerate(floors):
+            for t, m in enumerate(min_confs):
+                k = int(n_pick[i, j, t])
+                rows.append({
+                    "sample_n": s,
+                    "floor": f,
+                    "min_conf": m,
+                    "picks": k,
+                    "coverage": round(k / total, 4) if total else None,
+                    "hit_rate": round(int(n_hit[i, j, t]) / k, 4) if k else None,
+                    "brier": round(float(sum_brier[i, j, t]) / k, 4) if k else None,
+                    "log_loss": round(float(sum_ll[i, j, t]) / k, 4) if k else None,
+                    "calibration_score": 2 * int(n_hit[i, j, t]) - k,
+                })
+    return rows
+
+# Features are handed to pool workers once, by the initializer, not per task
+_WORKER_FEATS = None
+
+def _init_worker(feats):
+    global _WORKER_FEATS
+    _WORKER_FEATS = feats
+
+def _sweep_job(step, form_window, sample_ns, floors, min_confs):
+    feats = _WORKER_FEATS
+    p, n = library_reads(feats, step, form_window)
+    rows = score_reads(p, n, feats["result"], sample_ns, floors, min_confs)
+    return [{"step": step, "form_window": form_window, **row} for row in rows]
+
+def sweep(feats, steps=STEPS, form_windows=FORM_WINDOWS, sample_ns=SAMPLE_NS, floors=FLOORS,
+          min_confs=MIN_CONFS, jobs=None):
+    """Score the full grid; one pool task per (step, form_window)."""
+    missing = set(form_windows) - set(feats["form_windows"])
+    if missing:
+        raise ValueError(f"form windows {sorted(missing)} were not replayed")
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(feats,)) as pool:
+        futures = [pool.submit(_sweep_job, s, k, tuple(sample_ns), tuple(floors), tuple(min_confs))
+                   for s in steps for k in form_windows]
+        return [row for f in futures for row in f.result()]
+
+def rank(rows, key, min_coverage=0.0):
+    """Rows sorted best-first by `key`; configs below min_coverage are left out."""
+    desc = RANK_KEYS[key]
+    scored = [r for r in rows if r[key] is not None and r["coverage"] >= min_coverage]
+    return sorted(scored, key=lambda r: -r[key] if desc else r[key])
+
+# ------------------------- CLI -------------------------
+
+def _fmt(row):
+    def v(x, spec):
+        return "   -  " if x is None else format(x, spec)
+    return (f"step={row['step']} k={row['form_window']} sample_n={row['sample_n']:>2} floor={row['floor']:.2f} "
+            f"min_conf={row['min_conf']:>2} | coverage {v(row['coverage'], '.3f')} hit {v(row['hit_rate'], '.3f')} "
+            f"brier {v(row['brier'], '.4f')} log_loss {v(row['log_loss'], '.4f')} cal {row['calibration_score']:+d}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Backtest a grid of oracle parameters over past seasons.")
+    ap.add_argument("--seasons", required=True, metavar="SPEC", help="e.g. 2015-2024 or 2019,2021-2023")
+    ap.add_argument("--offline", action="store_true", help="read schedules from the local cache only")
+    ap.add_argument("--schedule-fixture", type=Path, default=None, metavar="PATH",
+                    help="Parquet/CSV file standing in for nflreadpy.load_schedules")
+    ap.add_argument("--steps", type=float, nargs="+", default=list(STEPS), help="bucket widths (points)")
+    ap.add_argument("--form-windows", type=int, nargs="+", default=list(FORM_WINDOWS), help="recent-form game counts")
+    ap.add_argument("--sample-ns", type=float, nargs="+", default=list(SAMPLE_NS),
+                    help="pregame_confidence sample_n (games for full sample weight)")
+    ap.add_argument("--floors", type=float, nargs="+", default=list(FLOORS), help="pregame_confidence floor")
+    ap.add_argument("--min-confs", type=float, nargs="+", default=list(MIN_CONFS),
+                    help="only pick when confidence is at least this")
+    ap.add_argument("--rank", choices=sorted(RANK_KEYS), default="brier")
+    ap.add_argument("--min-coverage", type=float, default=0.5,
+                    help="rank only configs that pick at least this share of games")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--out", type=Path, default=DEFAULT_OUT, metavar="PATH",
+                    help=f"full results as JSON (default: {DEFAULT_OUT})")
+    args = ap.parse_args()
+
+    steps = [int(s) if float(s).is_integer() else s for s in args.steps]
+    seasons = bd.parse_seasons(args.seasons)
+    windows = sorted(set(args.form_windows))
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        feats = replay_features(seasons, args.offline, args.schedule_fixture, windows, pool)
+    t1 = time.perf_counter()
+    rows = sweep(feats, steps, windows, args.sample_ns, args.floors, args.min_confs, args.jobs)
+    t2 = time.perf_counter()
+
+    print(f"[backtest] {len(seasons)} season(s), {len(feats['result'])} team-games; "
+          f"replay {t1 - t0:.1f}s, {len(rows)} configurations in {t2 - t1:.1f}s.")
+    ranked = rank(rows, args.rank, args.min_coverage)
+    print(f"[backtest] top {min(args.top, len(ranked))} by {args.rank}:")
+    for row in ranked[:args.top]:
+        print("  " + _fmt(row))
+    current = next((r for r in rows if all(r[k] == v for k, v in CURRENT.items())), None)
+    if current is not None:
+        place = next((i for i, r in enumerate(ranked) if r is current), None)
+        print(f"[backtest] current settings (rank {'-' if place is None else place + 1}/{len(ranked)}):")
+        print("  " + _fmt(current))
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    bd._atomic_write_text(args.out, json.dumps({
+        "seasons": seasons,
+        "team_games": int(len(feats["result"])),
+        "rank_by": args.rank,
+        "min_coverage": args.min_coverage,
+        "current": CURRENT,
+        "results": ranked + [r for r in rows if not any(r is q for q in ranked)],
+    }, indent=2))
+    print(f"[backtest] wrote {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
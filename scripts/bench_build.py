@@ -0,0 +1,261 @@
+"""
+Benchmark harness for scripts/build_data.py.
+
+Generates deterministic synthetic schedules in the same column shape as
+nflreadpy.load_schedules, times each build stage over 1 / 10 / 100 seasons
+(one league library carried across them), and fails (exit 1) when a stage
+regresses past the stored baseline.
+
+    python scripts/bench_build.py                     # compare to baseline
+    python scripts/bench_build.py --scales 1 10       # subset of sizes
+    python scripts/bench_build.py --teams 16 --post-tokens label --score-dist uniform
+    python scripts/bench_build.py --update-baseline   # re-record baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import build_data as bd
+
+BASELINE_PATH = Path(__file__).with_name("bench_baseline.json")
+STAGES = ["normalize", "replay", "pack_game", "output"]
+
+NFL_CODES = sorted(bd.NFL_TEAMS_32)
+
+POST_ROUNDS = [("WC", "Wild Card", 6), ("DIV", "Divisional", 4), ("CON", "Conference Championship", 2), ("SB", "Super Bowl", 1)]
+
+# ------------------------- Synthetic schedules -------------------------
+
+def _scores(rng, n, dist, strength_diff):
+    if dist == "nfl":
+        # touchdowns + field goals, shifted by relative team strength
+        lam = np.clip(2.4 + 0.35 * strength_diff, 0.3, None)
+        return 7 * rng.poisson(lam, n) + 3 * rng.poisson(1.6, n)
+    if dist == "uniform":
+        return rng.integers(0, 50, n)
+    raise ValueError(f"unknown score distribution: {dist}")
+
+def synth_schedule(n_teams=32, weeks=18, seasons=1, first_season=2000, seed=0,
+                   score_dist="nfl", postseason=True, post_tokens="round", played_weeks=None):
+    """
+    Deterministic schedule DataFrame shaped like nflreadpy.load_schedules:
+    game_id, season, game_type, week, gameday, away_team, away_score,
+    home_team, home_score (+ game_label for postseason rows).
+
+    - weeks: regular-season weeks per season (one game per team per week)
+    - post_tokens: "round" => game_type WC/DIV/CON/SB with numeric week;
+                   "label" => game_type POST, week NaN, round only in game_label
+                   (the build maps labels to weeks 19-22, so weeks must be <= 18)
+    - played_weeks: weeks after this (per season) are left unscored
+    """
+    if not 2 <= n_teams <= len(NFL_CODES):
+        raise ValueError(f"n_teams must be 2..{len(NFL_CODES)} (build filters to real NFL codes)")
+    if post_tokens not in ("round", "label"):
+        raise ValueError("post_tokens must be 'round' or 'label'")
+    if postseason and post_tokens == "label" and weeks > 18:
+        raise ValueError("post_tokens='label' needs weeks <= 18: labelled rounds are inferred as weeks 19-22")
+
+    rng = np.random.default_rng(seed)
+    teams = np.array(NFL_CODES[:n_teams])
+    rows = []
+
+    for s in range(seasons):
+        season = first_season + s
+        strength = rng.normal(0, 1, n_teams)
+        kickoff = pd.Timestamp(f"{season}-09-07")
+
+        def add_games(week, week_label, game_type, label, home_ix, away_ix):
+            h = _scores(rng, len(home_ix), score_dist, strength[home_ix] - strength[away_ix] + 0.2)
+            a = _scores(rng, len(home_ix), score_dist, strength[away_ix] - strength[home_ix])
+            scored = played_weeks is None or week <= played_weeks
+            day = str((kickoff + pd.Timedelta(days=7 * (week - 1))).date())
+            for hi, ai, hs, as_ in zip(home_ix, away_ix, h, a):
+                rows.append({
+                    "game_id": f"{season}_{week:02d}_{teams[ai]}_{teams[hi]}",
+                    "season": season,
+                    "game_type": game_type,
+                    "week": week_label,
+                    "gameday": day,
+                    "game_label": label,
+                    "away_team": teams[ai],
+                    "away_score": float(as_) if scored else np.nan,
+                    "home_team": teams[hi],
+                    "home_score": float(hs) if scored else np.nan,
+                })
+
+        for week in range(1, weeks + 1):
+            order = rng.permutation(n_teams)
+            pairs = order[: n_teams - n_teams % 2].reshape(-1, 2)
+            add_games(week, week, "REG", None, pairs[:, 0], pairs[:, 1])
+
+        if postseason:
+            alive = np.argsort(-strength)[: 2 * POST_ROUNDS[0][2]]
+            for r, (token, label, n_games) in enumerate(POST_ROUNDS):
+                week = weeks + 1 + r
+                n_games = min(n_games, len(alive) // 2)
+                if n_games == 0:
+                    break
+                field = rng.permutation(alive)[: 2 * n_games]
+                if post_tokens == "round":
+                    add_games(week, week, token, label, field[0::2], field[1::2])
+                else:
+                    add_games(week, np.nan, "POST", label, field[0::2], field[1::2])
+                alive = field[: max(1, n_games)]
+
+    return pd.DataFrame(rows)
+
+# ------------------------- Stage timing -------------------------
+
+@contextlib.contextmanager
+def _timed_pack_game(totals):
+    original = bd.pack_game
+
+    def timed(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            totals["pack_game"] += time.perf_counter() - t0
+
+    bd.pack_game = timed
+    try:
+        yield
+    finally:
+        bd.pack_game = original
+
+def time_stages(raw: pd.DataFrame, out_dir: Path) -> dict:
+    """
+    Stage totals over every season in raw, in order, with one league library
+    carried across seasons the way a --seasons backfill folds them.
+    """
+    t = {"pack_game": 0.0, "normalize": 0.0, "replay": 0.0, "output": 0.0, "games": 0}
+    library = knn = None
+    with contextlib.redirect_stdout(io.StringIO()), _timed_pack_game(t):
+        for season, season_raw in raw.groupby("season", sort=True):
+            t0 = time.perf_counter()
+            sched, home_col, away_col, all_teams = bd._prepare_schedule(season_raw.reset_index(drop=True))
+            t["normalize"] += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            fresh = lambda: bd._new_state(season, all_teams, library=library, knn=knn)
+            state, _, _ = bd._resume_replay(bd._week_batches(sched, home_col, away_col), [], fresh,
+                                            keep_snapshots=False)
+            library, knn = state["library"], state["knn"]
+            t["replay"] += time.perf_counter() - t0
+
+            # game dicts are packed lazily while the outputs are serialized
+            t0 = time.perf_counter()
+            bd._write_outputs(state, all_teams, season, out_dir=out_dir / str(season))
+            t["output"] += time.perf_counter() - t0
+            t["games"] += int(len(sched))
+    return t
+
+def verify_coherence(raw: pd.DataFrame) -> int:
+    """Streaming coherence must equal the reference formula on every team-game."""
+    sched, home_col, away_col, _ = bd._prepare_schedule(raw.copy())
+    hist = {}
+    bad = 0
+    for week, batch in bd._week_batches(sched, home_col, away_col):
+        week_games = []
+        for home, away, hs, aw in zip(batch["home"], batch["away"], batch["hs"], batch["as"]):
+            if np.isnan(hs) or np.isnan(aw):
+                continue
+            for team, pf, pa in ((home, int(hs), int(aw)), (away, int(aw), int(hs))):
+                h = hist.setdefault(team, {"pf": [], "pa": [], "m_pf": bd.RunningMoments(), "m_pa": bd.RunningMoments()})
+                ref = bd.coherence_reference(h["pf"], h["pa"], pf, pa)
+                if ref != bd.coherence_streaming(h["m_pf"], h["m_pa"], pf, pa):
+                    bad += 1
+                week_games.append((h, pf, pa))
+        for h, pf, pa in week_games:
+            h["pf"].append(pf); h["pa"].append(pa)
+            h["m_pf"].push(pf); h["m_pa"].push(pa)
+    return bad
+
+# ------------------------- CLI -------------------------
+
+def _load_baseline():
+    try:
+        return json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark build_data.py stages on synthetic schedules.")
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                    help="seasons per run, replayed in order through one league library")
+    ap.add_argument("--teams", type=int, default=32, help=f"teams per season (2..{len(NFL_CODES)})")
+    ap.add_argument("--weeks", type=int, default=18, help="regular-season weeks per season")
+    ap.add_argument("--score-dist", choices=["nfl", "uniform"], default="nfl",
+                    help="nfl: touchdowns + field goals shifted by team strength; uniform: 0-49")
+    ap.add_argument("--post-tokens", choices=["round", "label"], default="round",
+                    help="postseason as WC/DIV/CON/SB game types with numeric weeks, or POST + game_label only")
+    ap.add_argument("--no-postseason", action="store_true", help="regular season only")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per scale; the fastest is kept")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--tolerance", type=float, default=0.5,
+                    help="allowed slowdown vs baseline as a fraction (0.5 = +50%%)")
+    ap.add_argument("--min-delta", type=float, default=0.02,
+                    help="ignore regressions smaller than this many seconds (timer noise)")
+    ap.add_argument("--update-baseline", action="store_true", help=f"record results to {BASELINE_PATH.name}")
+    args = ap.parse_args()
+
+    schedule = dict(n_teams=args.teams, weeks=args.weeks, score_dist=args.score_dist,
+                    postseason=not args.no_postseason, post_tokens=args.post_tokens)
+    bad = verify_coherence(synth_schedule(seed=args.seed, **schedule))
+    if bad:
+        print(f"FAIL coherence_streaming != coherence_reference on {bad} team-games")
+        return 1
+
+    results = {}
+    for scale in args.scales:
+        raw = synth_schedule(seasons=scale, seed=args.seed, **schedule)
+        best = None
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                t = time_stages(raw, Path(tmp))
+            best = t if best is None else {k: min(best[k], t[k]) if k in STAGES else t[k] for k in t}
+        results[str(scale)] = best
+        print(f"{scale:>4}x  games={best['games']:>6}  " + "  ".join(f"{s}={best[s]:.3f}s" for s in STAGES))
+
+    if args.update_baseline:
+        rounded = {scale: {k: round(v, 4) if k in STAGES else v for k, v in t.items()} for scale, t in results.items()}
+        BASELINE_PATH.write_text(json.dumps({"schedule": schedule, "scales": rounded}, indent=2) + "\n",
+                                 encoding="utf-8")
+        print(f"baseline written to {BASELINE_PATH}")
+        return 0
+
+    baseline = _load_baseline()
+    if baseline is None:
+        print(f"no baseline at {BASELINE_PATH}; run with --update-baseline to record one")
+        return 0
+    if baseline.get("schedule") != schedule:
+        print(f"baseline was recorded for schedule {baseline.get('schedule')}; not comparing {schedule}")
+        return 0
+
+    regressions = []
+    for scale, t in results.items():
+        base = baseline.get("scales", {}).get(scale)
+        if not base:
+            continue
+        for stage in STAGES:
+            if stage in base and t[stage] > base[stage] * (1 + args.tolerance) and t[stage] - base[stage] > args.min_delta:
+                regressions.append(f"{scale}x {stage}: {t[stage]:.3f}s vs baseline {base[stage]:.3f}s")
+
+    if regressions:
+        print("FAIL stage regressions past baseline:")
+        for r in regressions:
+            print("  " + r)
+        return 1
+    print("ok: no stage regressed past baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Load test for scripts/serve.py.
+
+Starts the query server in a child process pinned to one CPU, then drives it
+over keep-alive connections with pipelined HTTP/1.1 requests (so the client
+costs as little as possible) and reports requests/second per scenario:
+
+  - api:     a mix of filtered /api/games queries (warm response cache)
+  - cold:    a distinct query every request (index lookups + JSON + gzip)
+  - 304:     the same queries revalidated with If-None-Match
+  - static:  docs/ files through the unchanged static path
+
+Exits 1 when the api scenario falls below --min-rps.
+
+    python scripts/bench_serve.py
+    python scripts/bench_serve.py --docs /path/to/docs --seconds 5 --connections 8
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import serve
+
+QUERIES = [
+    "/api/games?reality_lock=DIVERGE",
+    "/api/games?min_conf=80",
+    "/api/games?team=GB",
+    "/api/games?team=GB,DET&result=L",
+    "/api/games?result=W&min_conf=60&max_conf=70",
+    "/api/games?min_week=10&max_week=12&reality_lock=MATCH",
+    "/api/games?opponent=KC",
+    "/api/teams",
+]
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(docs: Path, port: int, cpu=0):
+    code = (
+        "import os, sys; sys.path.insert(0, %r)\n"
+        "if hasattr(os, 'sched_setaffinity'): os.sched_setaffinity(0, {%d})\n"
+        "import serve; serve.make_server(%r, port=%d).serve_forever()\n"
+    ) % (str(Path(__file__).resolve().parent), cpu, str(docs), port)
+    proc = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError("server exited: " + proc.stderr.read().decode("utf-8", "replace"))
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.I)
+
+def _request(path, headers=()):
+    lines = [f"GET {path} HTTP/1.1", "Host: 127.0.0.1", "Accept-Encoding: gzip"] + list(headers)
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("ascii")
+
+def _worker(port, requests, pipeline, stop, counts, statuses, latencies):
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    reader = sock.makefile("rb")
+    i = 0
+    while not stop.is_set():
+        batch = [requests[(i + k) % len(requests)] for k in range(pipeline)]
+        i += pipeline
+        t0 = time.perf_counter()
+        sock.sendall(b"".join(batch))
+        for _ in batch:
+            status = reader.readline().split(b" ", 2)[1]
+            length = 0
+            while True:
+                line = reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                m = _LENGTH.match(line)
+                if m:
+                    length = int(m.group(1))
+            reader.read(length)
+            statuses[status] = statuses.get(status, 0) + 1
+        latencies.append((time.perf_counter() - t0) / len(batch))
+        counts[0] += len(batch)
+    sock.close()
+
+def run_scenario(port, requests, seconds, connections, pipeline):
+    stop = threading.Event()
+    counts = [[0] for _ in range(connections)]
+    statuses = [{} for _ in range(connections)]
+    latencies = [[] for _ in range(connections)]
+    threads = [threading.Thread(target=_worker, args=(port, requests, pipeline, stop, counts[c], statuses[c], latencies[c]))
+               for c in range(connections)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    total = sum(c[0] for c in counts)
+    merged = {}
+    for s in statuses:
+        for k, v in s.items():
+            merged[k.decode()] = merged.get(k.decode(), 0) + v
+    lat = sorted(x for l in latencies for x in l)
+    return {
+        "requests": total,
+        "rps": total / elapsed,
+        "statuses": merged,
+        "p50_ms": 1000 * lat[len(lat) // 2] if lat else None,
+        "p99_ms": 1000 * lat[int(len(lat) * 0.99)] if lat else None,
+    }
+
+def _etags(port, paths):
+    tags = {}
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        reader = sock.makefile("rb")
+        for p in paths:
+            sock.sendall(_request(p))
+            reader.readline()
+            length, etag = 0, None
+            while True:
+                line = reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                k, _, v = line.decode("latin-1").partition(":")
+                if k.lower() == "content-length":
+                    length = int(v)
+                elif k.lower() == "etag":
+                    etag = v.strip()
+            reader.read(length)
+            tags[p] = etag
+    return tags
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test scripts/serve.py on one CPU.")
+    ap.add_argument("--docs", type=Path, default=serve.DEFAULT_DOCS)
+    ap.add_argument("--seconds", type=float, default=3.0, help="per scenario")
+    ap.add_argument("--connections", type=int, default=4)
+    ap.add_argument("--pipeline", type=int, default=16, help="requests in flight per connection")
+    ap.add_argument("--min-rps", type=float, default=1000.0, help="fail if the api scenario is slower")
+    args = ap.parse_args()
+
+    port = _free_port()
+    proc = start_server(args.docs.resolve(), port)
+    try:
+        static = [p.name for p in sorted(args.docs.glob("*.json"))][:8] or ["index.html"]
+        tags = _etags(port, QUERIES)
+        cold = [f"/api/games?min_conf={c / 10:.1f}&limit=50" for c in range(0, 1000)]
+        scenarios = {
+            "api": [_request(p) for p in QUERIES],
+            "cold": [_request(p + f"&max_conf={100 - i % 7}") for i, p in enumerate(cold * 50)],
+            "304": [_request(p, [f"If-None-Match: {tags[p]}"]) for p in QUERIES],
+            "static": [_request(f"/{name}") for name in static],
+        }
+        results = {}
+        for name, reqs in scenarios.items():
+            r = run_scenario(port, reqs, args.seconds, args.connections, args.pipeline)
+            results[name] = r
+            print(f"[bench-serve] {name:<6} {r['rps']:>8.0f} req/s  p50 {r['p50_ms']:.2f} ms  "
+                  f"p99 {r['p99_ms']:.2f} ms  {r['requests']} requests {r['statuses']}")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    cpus = os.cpu_count()
+    print(f"[bench-serve] server pinned to 1 CPU; client shares the machine ({cpus} CPU(s)).")
+    if results["api"]["rps"] < args.min_rps:
+        print(f"[bench-serve] FAIL: api {results['api']['rps']:.0f} req/s < {args.min_rps:.0f}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,27 @@
+from __future__ import annotations
+
+import bisect
+import contextlib
+import gzip
+import hashlib
 import json
+import os
+import pickle
+import platform
+import re
+import shutil
+import sys
+import time
+import tracemalloc
+import zlib
 from pathlib import Path
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 
 import numpy as np
-import pandas as pd
-import nflreadpy as nfl
+
+if TYPE_CHECKING:
+    import pandas as pd     # imported lazily at run time; render never needs it
 
 SEASON = 2025
 OUT_DIR = Path("docs")
@@ -49,6 +66,9 @@ NFL_TEAMS_32 = {
     "NYJ","PHI","PIT","SEA","SF","TB","TEN","WAS"
 }
 
+# Pre-relocation codes that appear in older seasons (used by --seasons backfills)
+NFL_HISTORICAL_TEAMS = {"OAK", "SD", "STL"}
+
 def _alias(team: str) -> str:
     if team is None:
         return "unknown"
@@ -83,17 +103,17 @@ def wl_expectation_from_hist(hist):
     t = hist.get("T", 0.0)
     return w + 0.5 * t
 
-def pregame_confidence(p_win, n):
+def pregame_confidence(p_win, n, sample_n=12, floor=0.15):
     """
     Confidence from:
-      - sample size n
-      - how far p_win is from 0.5
+      - sample size n (full weight at sample_n similar games)
+      - how far p_win is from 0.5 (a coin-flip read keeps `floor` of the weight)
     """
     if p_win is None or n is None or n <= 0:
         return None
     strength = min(1.0, abs(p_win - 0.5) * 2.0)
-    sample = np.log1p(n) / np.log1p(12)
-    conf = 35 + 65 * (0.15 + 0.85 * strength) * sample
+    sample = np.log1p(n) / np.log1p(sample_n)
+    conf = 35 + 65 * (floor + (1 - floor) * strength) * sample
     return clamp(conf, 0, 100)
 
 def win_loss_coherence_grade(conf, result, p_win):
@@ -129,26 +149,138 @@ def explain_pregame(team, opp, is_home, p_win, conf, hist):
         f"Confidence: {int(round(conf))}/100."
     )
 
-def _write_json(path: Path, payload: dict):
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+def _substantive_digest(payload) -> str:
+    # Hash of what a file says, ignoring the per-run "generated_at" stamp
+    if isinstance(payload, dict) and "generated_at" in payload:
+        payload = {k: v for k, v in payload.items() if k != "generated_at"}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def _existing_digest(path: Path):
+    try:
+        return _substantive_digest(json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        return None
+
+@contextlib.contextmanager
+def _atomic_open(path: Path):
+    # temp file + rename in the same directory: readers see old or new, never half
+    # pid in the name: --seasons workers may write the same file at once
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        yield f
+    os.replace(tmp, path)
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    with _atomic_open(path) as f:
+        f.write(data)
+
+def _atomic_write_text(path: Path, text: str):
+    _atomic_write_bytes(path, text.encode("utf-8"))
+
+def _write_json(path: Path, payload: dict) -> bool:
+    """
+    Write payload unless the file on disk already says the same thing
+    (timestamp aside). Returns True if the file was (re)written.
+    """
+    if _existing_digest(path) == _substantive_digest(payload):
+        return False
+    _atomic_write_text(path, json.dumps(payload, indent=2))
+    return True
+
+def _link_alias(canonical_path: Path, alias_path: Path):
+    """
+    Point alias_path at canonical_path's bytes: a hard link where the
+    filesystem allows it, otherwise a byte copy. Never re-serializes.
+    """
+    try:
+        if os.path.samefile(canonical_path, alias_path):
+            return
+    except OSError:
+        pass
+    tmp = alias_path.with_name(f".{alias_path.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(canonical_path, tmp)
+    except OSError:
+        shutil.copyfile(canonical_path, tmp)
+    os.replace(tmp, alias_path)
 
-def _write_with_alias_copies(canonical_key: str, payload: dict):
+def _write_with_alias_copies(canonical_key: str, payload: dict, out_dir=None) -> bool:
     """
-    Always write docs/<canonical_key>.json
-    Then write any EXTRA_OUTPUT_ALIASES copies (e.g., la.json for lar.json)
+    Write docs/<canonical_key>.json if its content changed.
+    Then link any EXTRA_OUTPUT_ALIASES copies (e.g., la.json for lar.json)
     """
-    canonical_path = OUT_DIR / f"{canonical_key}.json"
-    _write_json(canonical_path, payload)
+    out_dir = OUT_DIR if out_dir is None else out_dir
+    canonical_path = out_dir / f"{canonical_key}.json"
+    changed = _write_json(canonical_path, payload)
 
     # Lowercase alias copies
     for alt in EXTRA_OUTPUT_ALIASES.get(canonical_key, []):
-        alt_path = OUT_DIR / f"{alt}.json"
-        _write_json(alt_path, payload)
+        _link_alias(canonical_path, out_dir / f"{alt}.json")
 
     # OPTIONAL: also write an uppercase variant if something still references it
     if canonical_key == "lar":
-        upper_path = OUT_DIR / "LA.json"
-        _write_json(upper_path, payload)
+        _link_alias(canonical_path, out_dir / "LA.json")
+
+    return changed
+
+def _alias_keys(canonical_key: str):
+    return EXTRA_OUTPUT_ALIASES.get(canonical_key, []) + (["LA"] if canonical_key == "lar" else [])
+
+# ------------------------- Content-addressed outputs -------------------------
+
+# gb.json -> gb.<hash>.json: immutable twins that browsers may cache forever;
+# manifest.json (always fetched fresh) maps keys to the current names.
+CONTENT_HASH_LEN = 8
+OUTPUT_MANIFEST_FORMAT = "oracle-manifest/1"
+HASHED_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+\.[0-9a-f]{%d}\.json(\.gz|\.br)?$" % CONTENT_HASH_LEN)
+
+def _link_hashed(canonical_path: Path, suffixes=()) -> str:
+    """
+    Link canonical_path to <stem>.<hash>.json, where hash is the substantive
+    digest of the file as it is on disk (so it names what readers will get),
+    plus any precompressed siblings. Returns the hashed file name.
+    """
+    digest = _existing_digest(canonical_path)
+    if digest is None:
+        raise RuntimeError(f"Cannot content-address {canonical_path}: missing or unreadable.")
+    name = f"{canonical_path.stem}.{digest[:CONTENT_HASH_LEN]}.json"
+    for suffix in ("",) + tuple(suffixes):
+        src = canonical_path.with_name(canonical_path.name + suffix)
+        dst = canonical_path.with_name(name + suffix)
+        if src.exists() and not dst.exists():
+            _link_alias(src, dst)
+    return name
+
+def _write_output_manifest(out_dir: Path, season, teams, files, league, generated_at) -> bool:
+    """
+    manifest.json plus cleanup: hashed files referenced by neither the new
+    nor the previous manifest are deleted (a page that loaded the previous
+    manifest can still fetch what it names).
+    """
+    path = out_dir / "manifest.json"
+    try:
+        previous = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        previous = {}
+    manifest = {
+        "format": OUTPUT_MANIFEST_FORMAT,
+        "season": season,
+        "generated_at": generated_at,
+        "league": league,
+        "teams": teams,
+        "files": files,
+    }
+    changed = _write_json(path, manifest)
+
+    keep = set()
+    for m in (previous, manifest):
+        names = list((m.get("files") or {}).values()) + ([m["league"]] if m.get("league") else [])
+        keep.update(n + suffix for n in names for suffix in ("", ".gz", ".br"))
+    for f in out_dir.iterdir():
+        if HASHED_NAME_RE.match(f.name) and f.name not in keep:
+            f.unlink(missing_ok=True)
+    return changed
 
 # ------------------------- Playoff-safe schedule normalization -------------------------
 
@@ -158,16 +290,33 @@ def _first_existing(df: pd.DataFrame, candidates):
             return c
     return None
 
-def _get_game_type_row(r: pd.Series) -> str:
-    # Normalize possible columns to one uppercase token
-    for c in ["game_type", "season_type"]:
-        if c in r.index:
-            v = r.get(c)
-            if v is not None and not pd.isna(v):
-                return str(v).strip().upper()
-    return ""
+def _game_type_token(df: pd.DataFrame) -> pd.Series:
+    import pandas as pd
+    # Normalize possible columns to one uppercase token (first non-null wins)
+    gt = pd.Series("", index=df.index, dtype=object)
+    for c in reversed(["game_type", "season_type"]):
+        if c in df.columns:
+            v = df[c].astype(object)
+            gt = v.where(v.notna(), gt)
+    return _map_unique(gt, lambda u: u.astype(str).str.strip().str.upper())
+
+def _map_unique(s: pd.Series, fn) -> pd.Series:
+    """
+    Apply a vectorized string transform to the distinct values of a column only,
+    then broadcast back by category code. Schedules repeat a handful of tokens.
+    """
+    import pandas as pd
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    mapped = fn(pd.Series(uniques)).to_numpy()
+    out = np.empty(len(s), dtype=mapped.dtype if len(mapped) else object)
+    has = codes >= 0
+    out[has] = mapped[codes[has]]
+    if not has.all():
+        out[~has] = np.nan
+    return pd.Series(out, index=s.index)
 
 def _to_int_or_none(x):
+    import pandas as pd
     try:
         if x is None or pd.isna(x):
             return None
@@ -176,12 +325,35 @@ def _to_int_or_none(x):
     except Exception:
         return None
 
+POST_ROUND_TOKENS = {
+    "WC": 19, "WILD": 19, "WILDCARD": 19,
+    "DIV": 20, "DIVISIONAL": 20,
+    "CON": 21, "CONF": 21, "CONFCHAMP": 21, "CONFERENCE": 21,
+    "SB": 22, "SUPERBOWL": 22,
+}
+
+# Substring patterns for free-text week labels, checked in this order
+POST_ROUND_PATTERNS = [
+    (19, "post-1|wild|wc"),
+    (20, "post-2|div"),
+    (21, "post-3|conf|champ"),
+    (22, "post-4|super|sb"),
+]
+
+def _infer_post_round(labels: pd.Series) -> pd.Series:
+    import pandas as pd
+    s = labels.astype(str).str.lower()
+    conds = [s.str.contains(pat, regex=True).to_numpy() for _, pat in POST_ROUND_PATTERNS]
+    weeks = [float(wk) for wk, _ in POST_ROUND_PATTERNS]
+    return pd.Series(np.select(conds, weeks, default=np.nan), index=labels.index)
+
 def _derive_week_num(df: pd.DataFrame) -> pd.Series:
     """
     Create a robust numeric week for both REG and POST.
     - If week is numeric, use it.
     - Else if it's POST and we can infer the round, map to 19..22.
     """
+    import pandas as pd
     week_col = "week" if "week" in df.columns else None
 
     # Start with numeric week where possible
@@ -195,48 +367,26 @@ def _derive_week_num(df: pd.DataFrame) -> pd.Series:
     # If week missing on some rows, try derive from postseason round tokens
     # Common tokens you may see: WC/DIV/CON/SB or POST1/POST2 or "POST"
     # We'll only map if it's clearly postseason and week is NaN.
-    def map_post_round(r):
-        if pd.notna(r.get("week_num")):
-            return r.get("week_num")
-
-        gt = _get_game_type_row(r)
-
-        # Some feeds store exact rounds:
-        if gt in {"WC", "WILD", "WILDCARD"}:
-            return 19
-        if gt in {"DIV", "DIVISIONAL"}:
-            return 20
-        if gt in {"CON", "CONF", "CONFCHAMP", "CONFERENCE"}:
-            return 21
-        if gt in {"SB", "SUPERBOWL"}:
-            return 22
-
-        # If it's just "POST", try to infer from a "week" string if present like "post-1"
-        # Or from any round-like field names.
-        for c in ["week", "week_id", "game_week", "schedule_week", "game_label", "week_name"]:
-            if c in r.index:
-                v = r.get(c)
-                if v is None or pd.isna(v):
-                    continue
-                s = str(v).lower()
-                if "post-1" in s or "wild" in s or "wc" in s:
-                    return 19
-                if "post-2" in s or "div" in s:
-                    return 20
-                if "post-3" in s or "conf" in s or "champ" in s:
-                    return 21
-                if "post-4" in s or "super" in s or "sb" in s:
-                    return 22
-
-        # If cannot infer, leave NaN
-        return np.nan
-
-    tmp = df.copy()
-    tmp["week_num"] = week_num
-    tmp["week_num"] = tmp.apply(map_post_round, axis=1)
-    tmp["week_num"] = pd.to_numeric(tmp["week_num"], errors="coerce")
-
-    return tmp["week_num"]
+    if not week_num.isna().any():
+        return week_num
+
+    # Some feeds store exact rounds:
+    gt = _game_type_token(df)
+    week_num = week_num.fillna(gt.map(POST_ROUND_TOKENS).astype(float))
+
+    # If it's just "POST", try to infer from a "week" string if present like "post-1"
+    # Or from any round-like field names. First column with a match wins.
+    for c in ["week", "week_id", "game_week", "schedule_week", "game_label", "week_name"]:
+        if c not in df.columns:
+            continue
+        todo = week_num.isna() & df[c].notna()
+        if not todo.any():
+            continue
+        inferred = _map_unique(df.loc[todo, c].astype(object), _infer_post_round)
+        week_num.loc[todo] = inferred.astype(float)
+
+    # If cannot infer, leave NaN
+    return week_num
 
 def _filter_real_games_only(sched: pd.DataFrame) -> pd.DataFrame:
     """
@@ -251,7 +401,8 @@ def _filter_real_games_only(sched: pd.DataFrame) -> pd.DataFrame:
     df["away_team"] = df["away_team"].astype(str).str.upper()
 
     # Drop non-32-team rows (AFC/NFC, TBD, nan strings, etc.)
-    df = df[df["home_team"].isin(NFL_TEAMS_32) & df["away_team"].isin(NFL_TEAMS_32)].copy()
+    valid = NFL_TEAMS_32 | NFL_HISTORICAL_TEAMS
+    df = df[df["home_team"].isin(valid) & df["away_team"].isin(valid)].copy()
 
     # Filter by game/season type if present
     # Keep REG and postseason; drop PRE if it exists.
@@ -268,290 +419,2369 @@ def _filter_real_games_only(sched: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-# --------------------------------------------------------------------------------------
+# ------------------------- Build instrumentation -------------------------
 
-def build():
-    OUT_DIR.mkdir(exist_ok=True)
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:   # not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
 
-    # Load schedule (polars -> pandas). pyarrow required.
-    sched = nfl.load_schedules([SEASON]).to_pandas()
+class BuildMetrics:
+    """
+    Named stage spans (wall / CPU time, memory, row and game counts) and
+    per-week replay counters for one build, written out as the build manifest.
+    ru_maxrss is a process-wide high-water mark, so a stage records how far it
+    raised it (peak_rss_growth_mb, 0 when an earlier stage already peaked
+    higher); --trace-memory adds the stage's own tracemalloc peak.
+    """
 
-    home_col = "home_score" if "home_score" in sched.columns else ("home_points" if "home_points" in sched.columns else None)
-    away_col = "away_score" if "away_score" in sched.columns else ("away_points" if "away_points" in sched.columns else None)
-    if home_col is None or away_col is None:
-        raise RuntimeError("Could not find home/away score columns in schedule data.")
+    def __init__(self, trace_memory=False, profile_path=None):
+        self.trace_memory = trace_memory
+        self.profile_path = profile_path
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.stages = []
+        self.weeks = []
+        self.info = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, **counts):
+        """Time a block; the yielded dict collects counts set inside the block."""
+        span = {"name": name, **counts}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall0, cpu0, rss0 = time.perf_counter(), time.process_time(), _peak_rss_mb()
+        try:
+            yield span
+        finally:
+            span["wall_s"] = round(time.perf_counter() - wall0, 4)
+            span["cpu_s"] = round(time.process_time() - cpu0, 4)
+            rss = _peak_rss_mb()
+            span["peak_rss_growth_mb"] = None if rss is None else round(rss - rss0, 1)
+            span["process_peak_rss_mb"] = rss
+            if self.trace_memory:
+                span["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            self.stages.append(span)
+
+    def week(self, week, **counts):
+        self.weeks.append({"week": int(week), **counts})
+
+    @contextlib.contextmanager
+    def profiled(self):
+        """cProfile the block into profile_path (pstats format) when enabled."""
+        if not self.profile_path:
+            yield
+            return
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            Path(self.profile_path).parent.mkdir(parents=True, exist_ok=True)
+            prof.dump_stats(str(self.profile_path))
+
+    def manifest(self, status="ok", error=None):
+        hits = sum(w.get("library_hits", 0) for w in self.weeks)
+        misses = sum(w.get("library_misses", 0) for w in self.weeks)
+        return {
+            "status": status,
+            "error": error,
+            "started_at": self.started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            **self.info,
+            "totals": {
+                "wall_s": round(sum(s["wall_s"] for s in self.stages), 4),
+                "cpu_s": round(sum(s["cpu_s"] for s in self.stages), 4),
+                "peak_rss_mb": _peak_rss_mb(),
+                "library_hits": hits,
+                "library_misses": misses,
+            },
+            "stages": self.stages,
+            "weeks": self.weeks,
+            "profile": None if not self.profile_path else str(self.profile_path),
+        }
 
-    # NEW: Filter + normalize week for playoff safety
-    sched = _filter_real_games_only(sched)
+    def write(self, path: Path, status="ok", error=None):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write_text(path, json.dumps(self.manifest(status, error), indent=2))
 
-    # If nothing left after filtering, fail loudly (better than silently producing empty docs)
-    if sched.empty:
-        raise RuntimeError("Schedule became empty after filtering to real NFL games. Check feed schema/columns.")
+def _span(metrics, name, **counts):
+    # metrics.stage(...) when instrumented, otherwise a no-op that still yields a dict
+    return metrics.stage(name, **counts) if metrics is not None else contextlib.nullcontext(dict(counts))
 
-    # Create robust numeric week
-    sched["week_num"] = _derive_week_num(sched)
+# ------------------------- Oracle replay state + weekly checkpoint -------------------------
 
-    # Drop rows we cannot place on a timeline (rare, but safe)
-    sched = sched[pd.notna(sched["week_num"])].copy()
-    sched["week_num"] = sched["week_num"].astype(int)
+# Local, non-published working directory (checkpoints, caches). Not part of docs/.
+CACHE_DIR = Path(".oracle_cache")
+MANIFEST_PATH = CACHE_DIR / "build_manifest.json"
 
-    # Sort chronologically enough for weekly batching
-    sort_cols = ["week_num"]
-    if "game_id" in sched.columns:
-        sort_cols.append("game_id")
-    sched = sched.sort_values(sort_cols).reset_index(drop=True)
+# Bump if the pickled state layout changes in a way the code hash would not catch.
+CHECKPOINT_VERSION = 1
+PRIOR_LIBRARY_VERSION = 2
 
-    # Determine all teams in this dataset
-    all_teams = sorted(set(sched["home_team"]).union(set(sched["away_team"])))
+def _checkpoint_path(season: int) -> Path:
+    return CACHE_DIR / f"checkpoint_{season}.pkl"
+
+def _code_fingerprint() -> str:
+    # Any edit to this script (bucket rules, explanations, ...) invalidates old checkpoints.
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+def _week_fingerprint(batch: dict) -> str:
+    """
+    Hash of everything in a week that can change the replay: matchups and scores.
+    Unplayed games hash as -1, so a final score landing flips the fingerprint.
+    """
+    h = hashlib.sha256()
+    for key in ("game_id", "home", "away"):
+        h.update("\x1f".join(map(str, batch[key])).encode("utf-8") + b"\x1e")
+    for key in ("hs", "as"):
+        h.update(np.where(np.isnan(batch[key]), -1.0, batch[key]).tobytes())
+    return h.hexdigest()
+
+def _new_state(season: int, all_teams, library=None, knn=None, lookup="bucket", strength="pdpg") -> dict:
+    if lookup == "knn" and knn is None:
+        knn = KnnIndex()
+    return {
+        "lookup": lookup,
+        "strength": strength,
+        "ratings": SeasonRatings(all_teams) if strength == "srs" else None,
+        "library": BucketLibrary() if library is None else library,
+        "knn": knn,
+        "team_games_hist": {t: TeamHistory() for t in all_teams},
+        "team_moments": {t: {"pf": RunningMoments(), "pa": RunningMoments()} for t in all_teams},
+        "games": GameStore(all_teams),
+    }
+
+def _load_checkpoint(path: Path, header: dict):
+    """
+    Return the list of per-week snapshots, or [] if the checkpoint is missing,
+    unreadable, or was produced by different code / a different team set.
+    """
+    if not path.exists():
+        return []
+    try:
+        with path.open("rb") as f:
+            ckpt = pickle.load(f)
+    except Exception:
+        return []
+    if not isinstance(ckpt, dict) or ckpt.get("header") != header:
+        return []
+    return ckpt.get("weeks", [])
 
-    team_pf_hist = {t: [] for t in all_teams}
-    team_pa_hist = {t: [] for t in all_teams}
-    team_games_hist = {t: [] for t in all_teams}
+def _save_checkpoint(path: Path, header: dict, snapshots):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write_bytes(path, pickle.dumps({"header": header, "weeks": snapshots}, protocol=pickle.HIGHEST_PROTOCOL))
 
-    library = {}
-    team_out = {t: {"summary": {"team": t, "season": SEASON}, "games": []} for t in all_teams}
+def _prior_library_path(season: int) -> Path:
+    # League library (+ k-NN index) after every game through <season>, saved by --seasons backfills
+    return CACHE_DIR / f"library_through_{season}.pkl"
 
-    def team_stats_before_week(team, week_num, recent_k=3):
-        hist = [g for g in team_games_hist[team] if g["week"] < week_num]
-        n = len(hist)
+def _prior_library_header(strength="pdpg") -> dict:
+    # Same code fingerprint as the checkpoints: bucket rules / grid size live in this script
+    return {"version": PRIOR_LIBRARY_VERSION, "code": _code_fingerprint(), "strength": strength}
+
+def _load_prior_library(season: int, strength="pdpg"):
+    """
+    ({"library", "knn"}, digest) learned through <season>, or (None, None) when
+    there is none, it is unreadable, or it was saved by different code or with
+    a different strength feature.
+    """
+    path = _prior_library_path(season)
+    try:
+        blob = path.read_bytes()
+    except OSError:
+        return None, None
+    try:
+        prior = pickle.loads(blob)
+    except Exception as e:
+        print(f"[oracle] ignoring {path}: unreadable ({type(e).__name__}: {e}).")
+        return None, None
+    header = _prior_library_header(strength)
+    if not isinstance(prior, dict) or prior.get("header") != header:
+        saved = prior.get("header") if isinstance(prior, dict) else None
+        why = (f"learned with strength={saved['strength']}, not {strength}"
+               if saved and {**saved, "strength": strength} == header else "saved by a different build")
+        print(f"[oracle] ignoring {path}: {why}.")
+        return None, None
+    return prior, hashlib.sha256(blob).hexdigest()
+
+def _save_prior_library(season: int, library, knn=None, strength="pdpg"):
+    path = _prior_library_path(season)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write_bytes(path, pickle.dumps({"header": _prior_library_header(strength), "library": library, "knn": knn},
+                                           protocol=pickle.HIGHEST_PROTOCOL))
+
+def _season_start(season: int, all_teams, lookup="bucket", strength="pdpg"):
+    """
+    (fresh_state, prior_digest). Every fresh_state() call starts the season on
+    its own copy of the library saved through season - 1, so a replay from
+    week 1 never sees games folded in by an earlier replay.
+    """
+    prior, prior_digest = _load_prior_library(season - 1, strength)
+    blob = pickle.dumps(prior or {}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def fresh_state():
+        prior = pickle.loads(blob)
+        return _new_state(season, all_teams, library=prior.get("library"), knn=prior.get("knn"), lookup=lookup,
+                          strength=strength)
+    return fresh_state, prior_digest
+
+def _snapshot(state: dict) -> bytes:
+    return zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+def _restore(blob: bytes) -> dict:
+    return pickle.loads(zlib.decompress(blob))
+
+# --------------------------------------------------------------------------------------
+
+class TeamHistory:
+    """
+    Append-only game log for one team, backed by a running sum of point
+    differential. Games arrive in week order, so "games before week w" is a
+    prefix and n / pdpg / recent form are O(1) lookups instead of a rescan.
+    """
+    __slots__ = ("weeks", "cum_pd")
+
+    def __init__(self):
+        self.weeks = []
+        self.cum_pd = [0]   # cum_pd[i] = sum of (pf - pa) over the first i games
+
+    def __len__(self):
+        return len(self.weeks)
+
+    def append(self, week, pf, pa):
+        self.weeks.append(int(week))
+        self.cum_pd.append(self.cum_pd[-1] + (pf - pa))
+
+    def count_before(self, week_num):
+        # Replay always asks about the current week, after every logged game
+        if not self.weeks or self.weeks[-1] < week_num:
+            return len(self.weeks)
+        return bisect.bisect_left(self.weeks, week_num)
+
+    def stats_before(self, week_num, recent_k=3):
+        n = self.count_before(week_num)
         if n == 0:
             return {"n": 0, "pdpg": 0.0, "form": 0.0}
-        pf = np.array([g["pf"] for g in hist], dtype=float)
-        pa = np.array([g["pa"] for g in hist], dtype=float)
-        pdpg = float(np.mean(pf - pa))
-        recent = hist[-recent_k:]
-        recent_pd = float(np.mean([g["pf"] - g["pa"] for g in recent])) if recent else 0.0
-        return {"n": n, "pdpg": pdpg, "form": recent_pd}
-
-    def make_bucket(is_home, team_pdpg, opp_pdpg, team_form, opp_form):
+        total = self.cum_pd[n]
+        k = min(recent_k, n)
+        return {"n": n, "pdpg": total / n, "form": (total - self.cum_pd[n - k]) / k}
+
+# Team strength feature for buckets / k-NN: "pdpg" (raw point differential per
+# game) or "srs" (schedule-adjusted SeasonRatings below).
+STRENGTH_FEATURES = ("pdpg", "srs")
+# Ridge toward 0 for every team rating (~ that many 0-margin games against an
+# average opponent); keeps early-week ratings sane. 0 = plain least squares.
+RATING_RIDGE = 1.0
+RATING_TOL = 1e-6
+
+class SeasonRatings:
+    """
+    Simple rating system over the games logged so far this season:
+        margin = rating_home - rating_away + home_edge
+    fitted by (ridge-regularized) least squares. The design matrix is sparse
+    and never materialized -- two team indices per game -- so A @ x and
+    A.T @ y are a gather and two bincounts. The normal equations are solved
+    by conjugate gradients warm-started from the previous week's solution,
+    which only moves by one week of games.
+    """
+    __slots__ = ("index", "home", "away", "margin", "x", "ridge", "stale", "iterations")
+
+    def __init__(self, teams, ridge=RATING_RIDGE):
+        self.index = {t: i for i, t in enumerate(teams)}
+        self.home, self.away, self.margin = [], [], []
+        self.x = np.zeros(len(self.index) + 1)     # team ratings..., home edge
+        self.ridge = ridge
+        self.stale = False
+        self.iterations = 0
+
+    def __len__(self):
+        return len(self.margin)
+
+    def add_game(self, home, away, margin):
+        self.home.append(self.index[home])
+        self.away.append(self.index[away])
+        self.margin.append(float(margin))
+        self.stale = True
+
+    def _normal(self, x, h, a):
+        # (A.T A + ridge * I_teams) x; the home edge is not regularized
+        y = x[h] - x[a] + x[-1]
+        out = np.bincount(h, y, len(x)) - np.bincount(a, y, len(x))
+        out[-1] = y.sum()
+        out[:-1] += self.ridge * x[:-1]
+        return out
+
+    def solve(self, maxiter=None):
+        """Current ratings as ({team: rating}, home_edge); re-solved only after new games."""
+        if self.stale:
+            h, a = np.array(self.home), np.array(self.away)
+            m = np.array(self.margin)
+            b = np.bincount(h, m, len(self.x)) - np.bincount(a, m, len(self.x))
+            b[-1] = m.sum()
+            x = self.x.copy()
+            r = b - self._normal(x, h, a)
+            p = r.copy()
+            rs = r @ r
+            stop = (RATING_TOL * np.linalg.norm(b)) ** 2
+            for _ in range(maxiter or 4 * len(x)):
+                if rs <= stop:
+                    break
+                q = self._normal(p, h, a)
+                alpha = rs / (p @ q)
+                x += alpha * p
+                r -= alpha * q
+                rs, rs_old = r @ r, rs
+                p = r + (rs / rs_old) * p
+                self.iterations += 1
+            if self.ridge == 0:
+                x[:-1] -= x[:-1].mean()     # ratings are only defined up to a constant
+            self.x = x
+            self.stale = False
+        return dict(zip(self.index, self.x[:-1].tolist())), float(self.x[-1])
+
+def _rating_summary(state) -> dict:
+    """{team: {"srs", "rank", "home_edge", "games"}} from the season's ratings, or {}."""
+    ratings = state.get("ratings")
+    if ratings is None:
+        return {}
+    table, home_edge = ratings.solve()
+    games = state["team_games_hist"]
+    order = sorted(table, key=lambda t: -table[t])
+    return {t: {"srs": round(table[t], 2), "rank": order.index(t) + 1,
+                "home_edge": round(home_edge, 2), "games": len(games[t])} for t in table}
+
+class RunningMoments:
+    """
+    Streaming moments of one per-team stat (points for / points against).
+
+    Welford mean/M2 give the z-score of a new game against history + [game]
+    in O(1). Coherence also needs the mean/std of the *scored* history
+    (to_score of each past z), which is nonlinear in the values, so a
+    histogram of the (integer) point totals is kept alongside; its size is
+    bounded by the distinct scores seen, not by the number of games.
+    """
+    __slots__ = ("n", "mean", "m2", "counts")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.counts = {}
+
+    def push(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        self.counts[x] = self.counts.get(x, 0) + 1
+
+    def z_with(self, x):
+        # z of x within history + [x], without mutating the tracker
+        n = self.n + 1
+        delta = x - self.mean
+        mean = self.mean + delta / n
+        m2 = self.m2 + delta * (x - mean)
+        return (x - mean) / (np.sqrt(m2 / n) + 1e-6)
+
+    def score_moments(self, sign=1.0):
+        # mean / std (+1e-6) of to_score(sign * z) over the logged history
+        vals = np.fromiter(self.counts.keys(), dtype=float, count=len(self.counts))
+        cnt = np.fromiter(self.counts.values(), dtype=float, count=len(self.counts))
+        z = sign * (vals - self.mean) / (np.sqrt(self.m2 / self.n) + 1e-6)
+        scores = 30 + 70 / (1 + np.exp(-z))
+        mu = float(np.dot(cnt, scores) / self.n)
+        sd = float(np.sqrt(np.dot(cnt, (scores - mu) ** 2) / self.n)) + 1e-6
+        return mu, sd
+
+def coherence_reference(pf_hist, pa_hist, pf, pa):
+    """
+    Postgame coherence by definition: z-score the game against the team's
+    full history. O(history) per call; kept as the reference that
+    coherence_streaming must reproduce.
+    """
+    pf_arr = np.array(list(pf_hist) + [pf], dtype=float)
+    pa_arr = np.array(list(pa_hist) + [pa], dtype=float)
+    off_score = to_score(zscore(pf_arr)[-1])
+    def_score = to_score(zscore(-pa_arr)[-1])
+    sig = np.array([off_score, def_score], dtype=float)
+
+    if len(pf_hist) >= 2:
+        off_hist = [to_score(z) for z in zscore(np.array(pf_hist, dtype=float))]
+        def_hist = [to_score(z) for z in zscore(-np.array(pa_hist, dtype=float))]
+        mu = np.array([np.mean(off_hist), np.mean(def_hist)], dtype=float)
+        sd = np.array([np.std(off_hist) + 1e-6, np.std(def_hist) + 1e-6], dtype=float)
+    else:
+        mu = sig
+        sd = np.array([1.0, 1.0], dtype=float)
+
+    dist = float(np.sqrt(np.mean(((sig - mu) / sd) ** 2)))
+    return round(clamp(95 - 25 * dist, 0, 100), 1)
+
+def coherence_streaming(pf_moments, pa_moments, pf, pa):
+    """Same value as coherence_reference, from RunningMoments in O(1) per game."""
+    if pf_moments.n < 2:
+        # mu == sig => dist 0
+        return round(clamp(95, 0, 100), 1)
+    off_score = to_score(pf_moments.z_with(pf))
+    def_score = to_score(-pa_moments.z_with(pa))
+    off_mu, off_sd = pf_moments.score_moments()
+    def_mu, def_sd = pa_moments.score_moments(sign=-1.0)
+    dist = float(np.sqrt((((off_score - off_mu) / off_sd) ** 2 + ((def_score - def_mu) / def_sd) ** 2) / 2))
+    return round(clamp(95 - 25 * dist, 0, 100), 1)
+
+def team_stats_before_week(state, team, week_num, recent_k=3):
+    return state["team_games_hist"][team].stats_before(week_num, recent_k)
+
+def make_bucket(is_home, team_pdpg, opp_pdpg, team_form, opp_form):
+    return (
+        int(is_home),
+        bucketize(team_pdpg, step=3),
+        bucketize(opp_pdpg, step=3),
+        bucketize(team_form, step=3),
+        bucketize(opp_form, step=3),
+    )
+
+# Dense library grid: the four bucketized stats are clipped to +-LIBRARY_BIN_RADIUS
+# bins (+-30 points at step=3); anything beyond shares the edge cell.
+LIBRARY_BIN_RADIUS = 10
+# Exact cells with fewer samples back off to the +-1, then +-2 bin neighborhood
+LIBRARY_MIN_SAMPLES = 3
+LIBRARY_BACKOFF_RADII = (1, 2)
+RESULTS = ("W", "L", "T")
+
+class BucketLibrary:
+    """
+    League library as a dense W/L/T count tensor over the bucket grid
+    (home flag x four stat bins), plus a summed-area table over the four stat
+    axes kept current on every update. Any +-r box of cells sums in O(1)
+    (16 SAT corners), so sparse exact cells can back off to their
+    neighborhood, and a whole week of lookups is one batched array query.
+    """
+    __slots__ = ("counts", "sat")
+
+    SIDE = 2 * LIBRARY_BIN_RADIUS + 1
+
+    def __init__(self):
+        side = self.SIDE
+        # result axis first keeps each SAT update a contiguous 4-D block
+        self.counts = np.zeros((len(RESULTS), 2, side, side, side, side), dtype=np.int32)
+        # sat[r, h, i, j, k, l] = counts summed over bins < (i, j, k, l)
+        self.sat = np.zeros((len(RESULTS), 2, side + 1, side + 1, side + 1, side + 1), dtype=np.int32)
+
+    def __len__(self):
+        # number of occupied cells
+        return int(np.count_nonzero(self.counts.any(axis=0)))
+
+    def __getstate__(self):
+        # sparse on disk; the SAT is rebuilt on load
+        nz = np.nonzero(self.counts)
+        return {"index": np.stack(nz, axis=1).astype(np.int16), "values": self.counts[nz]}
+
+    def __setstate__(self, st):
+        self.__init__()
+        idx = st["index"].astype(np.intp)
+        self.counts[tuple(idx.T)] = st["values"]
+        stat_sums = self.counts
+        for axis in range(2, 6):
+            stat_sums = np.cumsum(stat_sums, axis=axis, dtype=np.int32)
+        self.sat[:, :, 1:, 1:, 1:, 1:] = stat_sums
+
+    @classmethod
+    def cells(cls, buckets):
+        """make_bucket tuples (or an (m, 5) array) -> grid indexes."""
+        b = np.asarray(buckets, dtype=np.int64).reshape(-1, 5)
+        cells = b.copy()
+        cells[:, 1:] = np.clip(b[:, 1:] + LIBRARY_BIN_RADIUS, 0, cls.SIDE - 1)
+        return cells
+
+    def update_many(self, buckets, results):
+        cells = self.cells(buckets)
+        res = np.array([RESULTS.index(r) for r in results], dtype=np.intp)
+        np.add.at(self.counts, (res, cells[:, 0], cells[:, 1], cells[:, 2], cells[:, 3], cells[:, 4]), 1)
+        for (h, a, b, c, d), r in zip(cells.tolist(), res.tolist()):
+            self.sat[r, h, a + 1:, b + 1:, c + 1:, d + 1:] += 1
+
+    def box_counts(self, cells, radius):
+        """(m, 3) W/L/T totals over the +-radius box around each cell."""
+        lo = np.clip(cells[:, 1:] - radius, 0, self.SIDE)
+        hi = np.clip(cells[:, 1:] + radius + 1, 0, self.SIDE)
+        total = np.zeros((len(cells), len(RESULTS)), dtype=np.int64)
+        for corner in range(16):
+            picks = [(corner >> d) & 1 for d in range(4)]
+            idx = [hi[:, d] if picks[d] else lo[:, d] for d in range(4)]
+            sign = -1 if (4 - sum(picks)) % 2 else 1
+            total += sign * self.sat[:, cells[:, 0], idx[0], idx[1], idx[2], idx[3]].T
+        return total
+
+    def lookup_many(self, buckets, min_n=LIBRARY_MIN_SAMPLES, radii=LIBRARY_BACKOFF_RADII):
+        """
+        Batched lookup. Returns ((m, 3) W/L/T counts, (m,) radius used).
+        Cells below min_n widen to each radius in turn; if none reaches
+        min_n the widest neighborhood is used.
+        """
+        cells = self.cells(buckets)
+        counts = self.counts[:, cells[:, 0], cells[:, 1], cells[:, 2], cells[:, 3], cells[:, 4]].T.astype(np.int64)
+        radius = np.zeros(len(cells), dtype=np.int64)
+        for r in radii:
+            need = counts.sum(axis=1) < min_n
+            if not need.any():
+                break
+            counts[need] = self.box_counts(cells[need], r)
+            radius[need] = r
+        return counts, radius
+
+def _hist_read(w, l, t, radius):
+    hist_norm = None
+    p = None
+    conf = None
+    n = w + l + t
+    if n > 0:
+        w_ = w / n
+        l_ = l / n
+        t_ = t / n
+        hist_norm = {"n": n, "W": round(w_, 3), "L": round(l_, 3), "T": round(t_, 3), "radius": radius}
+        p = wl_expectation_from_hist(hist_norm)
+        conf = pregame_confidence(p, n)
+    return hist_norm, p, conf
+
+def _pregame_reads(state, buckets):
+    """[(hist_norm, p_win, conf), ...] for a batch of buckets in one library query."""
+    if not buckets:
+        return []
+    counts, radius = state["library"].lookup_many(buckets)
+    return [_hist_read(w, l, t, r) for (w, l, t), r in zip(counts.tolist(), radius.tolist())]
+
+# k-NN lookup mode: feature scaling puts the point stats in bucket-step units
+# and makes a home/away mismatch cost as much as KNN_HOME_WEIGHT bins.
+KNN_K = 25
+KNN_HOME_WEIGHT = 2.0
+KNN_FEATURE_SCALE = np.array([KNN_HOME_WEIGHT, 1 / 3, 1 / 3, 1 / 3, 1 / 3])
+KNN_DIST_EPS = 1.0      # distance weighting: w = 1 / (d + eps)
+# Sample size of a read: each neighbor counts exp(-(d / bandwidth)^2), so n says
+# how many *close* situations back it (bandwidth in bucket steps), not just k.
+KNN_BANDWIDTH = 3.0
+
+class KnnIndex:
+    """
+    Growing k-NN index over past team-games' continuous pregame features.
+
+    Logarithmic method (Bentley-Saxe): points live in static KD-trees whose
+    sizes at least double down the stack; a weekly batch becomes a new tree
+    and merges into any tree no larger than itself. Each point is rebuilt
+    O(log n) times overall and a query visits O(log n) trees, so adds and
+    queries stay logarithmic as the history grows across seasons.
+    """
+    __slots__ = ("blocks",)
+
+    def __init__(self):
+        self.blocks = []    # [(X (n, 5) scaled, y (n, 3) one-hot W/L/T, tree)]
+
+    def __len__(self):
+        return sum(len(X) for X, _, _ in self.blocks)
+
+    def __getstate__(self):
+        return {"blocks": [(X, y) for X, y, _ in self.blocks]}
+
+    def __setstate__(self, st):
+        self.blocks = [(X, y, self._tree(X)) for X, y in st["blocks"]]
+
+    @staticmethod
+    def _tree(X):
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError as e:
+            raise RuntimeError("lookup='knn' needs scipy (pip install scipy).") from e
+        return cKDTree(X)
+
+    def add_many(self, features, results):
+        X = np.asarray(features, dtype=float).reshape(-1, 5) * KNN_FEATURE_SCALE
+        y = np.zeros((len(X), len(RESULTS)))
+        y[np.arange(len(X)), [RESULTS.index(r) for r in results]] = 1.0
+        while self.blocks and len(self.blocks[-1][0]) <= len(X):
+            bX, by, _ = self.blocks.pop()
+            X, y = np.vstack([bX, X]), np.vstack([by, y])
+        self.blocks.append((X, y, self._tree(X)))
+
+    def query_many(self, features, k=KNN_K):
+        """
+        Returns ((m, 3) distance-weighted W/L/T shares, (m,) kernel-weighted
+        sample size, (m,) mean neighbor distance). Rows are all-zero when the
+        index is empty.
+        """
+        Q = np.asarray(features, dtype=float).reshape(-1, 5) * KNN_FEATURE_SCALE
+        m = len(Q)
+        if not self.blocks:
+            return np.zeros((m, len(RESULTS))), np.zeros(m), np.zeros(m)
+        dists, labels = [], []
+        for X, y, tree in self.blocks:
+            kk = min(k, len(X))
+            d, i = tree.query(Q, k=kk)
+            d, i = d.reshape(m, kk), i.reshape(m, kk)
+            dists.append(d)
+            labels.append(y[i])
+        d = np.hstack(dists)
+        lab = np.concatenate(labels, axis=1)
+        kk = min(k, d.shape[1])
+        nearest = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+        d = np.take_along_axis(d, nearest, axis=1)
+        lab = np.take_along_axis(lab, nearest[:, :, None], axis=1)
+        w = 1.0 / (d + KNN_DIST_EPS)
+        shares = (w[:, :, None] * lab).sum(axis=1) / w.sum(axis=1, keepdims=True)
+        n = np.exp(-(d / KNN_BANDWIDTH) ** 2).sum(axis=1)
+        return shares, n, d.mean(axis=1)
+
+def _knn_reads(state, features):
+    """k-NN counterpart of _pregame_reads: [(hist_norm, p_win, conf), ...]."""
+    if not features:
+        return []
+    shares, n, mean_dist = state["knn"].query_many(features)
+    reads = []
+    for (w_, l_, t_), n_, md in zip(shares.tolist(), n.tolist(), mean_dist.tolist()):
+        if round(n_) < 1:
+            # nothing close enough to call similar: withheld, like an empty bucket
+            reads.append((None, None, None))
+            continue
+        hist_norm = {"n": int(round(n_)), "W": round(w_, 3), "L": round(l_, 3), "T": round(t_, 3),
+                     "mean_dist": round(md, 2)}
+        p = wl_expectation_from_hist(hist_norm)
+        reads.append((hist_norm, p, pregame_confidence(p, n_)))
+    return reads
+
+def pack_game(week, team, opp, is_home, pf, pa, result, coherence, p_win, conf, hist_norm):
+    pick = None
+    if p_win is not None:
+        pick = "W" if p_win >= 0.5 else "L"
+
+    reality_lock = None
+    if result is not None and hist_norm and hist_norm.get("n", 0) > 0 and pick is not None:
+        reality_lock = "MATCH" if result == pick else "DIVERGE"
+
+    wlc = win_loss_coherence_grade(conf, result, p_win)
+    explain_pre = explain_pregame(team, opp, is_home, p_win, conf, hist_norm)
+
+    if result is None:
+        explain_post = "Upcoming game. Postgame coherence will appear after the game is played."
+    else:
+        if hist_norm and hist_norm.get("n", 0) > 0:
+            explain_post = (
+                f"Postgame: coherence {coherence}. "
+                f"Pregame expected win rate was ~{int(round(p_win*100))}% (n={hist_norm['n']}), "
+                f"and reality lock is {reality_lock}."
+            )
+        else:
+            explain_post = f"Postgame: coherence {coherence}. Oracle had insufficient similar-history pregame, so no reality lock was claimed."
+
+    return {
+        "week": int(week),
+        "opponent": opp,
+        "result": result,
+        "score": None if result is None else f"{pf}-{pa}",
+        "oracle": {
+            "pregame_pick": pick,
+            "pregame_expected_win_rate": None if p_win is None else round(float(p_win), 3),
+            "pregame_confidence": None if conf is None else round(float(conf), 1),
+            "pregame_historical_map": hist_norm,
+            "pregame_bucket": None,
+            "explain_pregame": explain_pre,
+
+            "coherence": coherence,
+            "reality_lock": reality_lock,
+            "win_loss_coherence": wlc,
+            "explain": explain_post,
+        }
+    }
+
+# ------------------------- Columnar game store -------------------------
+
+class GameStore:
+    """
+    Every team-game of a season, one row each, in typed NumPy columns.
+
+    The replay appends one chunk per week; chunks are concatenated on first
+    read. Historical maps are interned (a handful of distinct dicts back
+    thousands of games) and extra per-game fields (e.g. efficiency) live in
+    sparse side columns. The nested JSON dict of a game, explanations
+    included, is only built by pack_game when a team is serialized.
+    """
+    COLUMNS = {
+        "team": np.int16, "opp": np.int16, "week": np.int32, "is_home": np.bool_,
+        "pf": np.int32, "pa": np.int32,            # -1 = not played
+        "result": np.int8,                         # index into RESULTS, -1 = not played
+        "coherence": np.float64, "p_win": np.float64, "conf": np.float64,   # NaN = none
+        "hist": np.int32,                          # index into self.hists, -1 = no read
+    }
+
+    def __init__(self, teams):
+        self.teams = list(teams)
+        self.team_index = {t: i for i, t in enumerate(self.teams)}
+        self.hists = []
+        self.hist_index = {}
+        self.extras = {}          # field -> {row: value}
+        self._chunks = {c: [] for c in self.COLUMNS}
+        self._n = 0
+        self._summaries = None
+
+    def __len__(self):
+        return self._n
+
+    def _intern_hist(self, hist):
+        if hist is None:
+            return -1
+        key = tuple(hist.items())
+        i = self.hist_index.get(key)
+        if i is None:
+            i = self.hist_index[key] = len(self.hists)
+            self.hists.append(hist)
+        return i
+
+    def append_week(self, week, records, reads):
+        """One week of _week_records rows with their (hist_norm, p_win, conf) reads."""
+        if not records:
+            return
+        team, opp, is_home, pf, pa, result, coherence = (list(c) for c in zip(*(r[:7] for r in records)))
+        hist, p_win, conf = zip(*reads)
+        cols = {
+            "team": [self.team_index[t] for t in team],
+            "opp": [self.team_index[t] for t in opp],
+            "week": [week] * len(records),
+            "is_home": is_home,
+            "pf": [-1 if v is None else v for v in pf],
+            "pa": [-1 if v is None else v for v in pa],
+            "result": [-1 if r is None else RESULTS.index(r) for r in result],
+            "coherence": [np.nan if v is None else v for v in coherence],
+            "p_win": [np.nan if v is None else v for v in p_win],
+            "conf": [np.nan if v is None else v for v in conf],
+            "hist": [self._intern_hist(h) for h in hist],
+        }
+        for c, dtype in self.COLUMNS.items():
+            self._chunks[c].append(np.array(cols[c], dtype=dtype))
+        self._n += len(records)
+        self._summaries = None
+
+    def column(self, name):
+        chunks = self._chunks[name]
+        if len(chunks) != 1:
+            arr = np.concatenate(chunks) if chunks else np.zeros(0, dtype=self.COLUMNS[name])
+            self._chunks[name] = chunks = [arr]
+        return chunks[0]
+
+    def to_state(self) -> dict:
+        """Plain dicts / lists / arrays only, so a persisted store loads from any entry point."""
+        return {"teams": self.teams, "hists": self.hists, "extras": self.extras,
+                "columns": {c: self.column(c) for c in self.COLUMNS}}
+
+    @classmethod
+    def from_state(cls, d):
+        store = cls(d["teams"])
+        for h in d["hists"]:
+            store._intern_hist(h)
+        store.extras = d["extras"]
+        for c, dtype in cls.COLUMNS.items():
+            store._chunks[c] = [np.asarray(d["columns"][c], dtype=dtype)]
+        store._n = len(store._chunks["team"][0])
+        return store
+
+    def set_extra(self, field, row, value):
+        self.extras.setdefault(field, {})[int(row)] = value
+
+    def team_rows(self, team):
+        """Row ids of one team's games in week order."""
+        rows = np.flatnonzero(self.column("team") == self.team_index[team])
+        return rows[np.argsort(self.column("week")[rows], kind="stable")]
+
+    def view(self, row):
+        return GameView(self, row)
+
+    def games(self, team):
+        return [GameView(self, r) for r in self.team_rows(team).tolist()]
+
+    def game_dicts(self, team):
+        return [GameView(self, r).to_dict() for r in self.team_rows(team).tolist()]
+
+    def reality_locks(self):
+        """+1 MATCH / -1 DIVERGE / 0 no claim, per row (see pack_game)."""
+        hist = self.column("hist")
+        has_read = hist >= 0
+        if self.hists:
+            n = np.array([h.get("n", 0) for h in self.hists])
+            has_read &= n[np.maximum(hist, 0)] > 0
+        p_win = self.column("p_win")
+        has_read &= ~np.isnan(p_win)
+        result = self.column("result")
+        pick = np.where(p_win >= 0.5, RESULTS.index("W"), RESULTS.index("L"))
+        locks = np.where(result == pick, 1, -1)
+        return np.where(has_read & (result >= 0), locks, 0)
+
+    def summaries(self):
+        """
+        {team: {"record", "win_pct", "calibration_score", "calibration_trail"}},
+        from counts per (team, result) and one cumulative sum of reality locks
+        over the played games ordered by (team, week).
+        """
+        if self._summaries is not None:
+            return self._summaries
+        team, week, result = self.column("team"), self.column("week"), self.column("result")
+        n_teams = len(self.teams)
+        played = result >= 0
+        counts = np.zeros((n_teams, len(RESULTS)), dtype=np.int64)
+        np.add.at(counts, (team[played], result[played]), 1)
+
+        rows = np.flatnonzero(played)
+        rows = rows[np.lexsort((week[rows], team[rows]))]
+        trail = np.cumsum(self.reality_locks()[rows])
+        bounds = np.searchsorted(team[rows], np.arange(n_teams + 1))
+        base = np.concatenate([[0], trail])[bounds[:-1]]
+
+        out = {}
+        for i, t in enumerate(self.teams):
+            w, l, ti = counts[i].tolist()
+            n = w + l + ti
+            team_trail = (trail[bounds[i]:bounds[i + 1]] - base[i]).tolist()
+            out[t] = {
+                "record": f"{w}-{l}-{ti}",
+                "win_pct": None if n == 0 else round(float((w + 0.5 * ti) / n), 3),
+                "calibration_score": team_trail[-1] if team_trail else 0,
+                "calibration_trail": team_trail,
+            }
+        self._summaries = out
+        return out
+
+    def team_signature(self, team):
+        """Everything serialized for one team's games, cheap to compare across replays."""
+        rows = self.team_rows(team)
+        hist = self.column("hist")[rows]
         return (
-            int(is_home),
-            bucketize(team_pdpg, step=3),
-            bucketize(opp_pdpg, step=3),
-            bucketize(team_form, step=3),
-            bucketize(opp_form, step=3),
+            tuple(self.column(c)[rows].tobytes() for c in self.COLUMNS if c != "hist"),
+            tuple(None if h < 0 else tuple(self.hists[h].items()) for h in hist.tolist()),
+            json.dumps({f: [v.get(r) for r in rows.tolist()] for f, v in self.extras.items()}, sort_keys=True),
         )
 
-    def library_lookup(bucket):
-        return library.get(bucket)
-
-    def library_update(bucket, result):
-        if bucket not in library:
-            library[bucket] = {"W": 0, "L": 0, "T": 0, "n": 0}
-        library[bucket][result] += 1
-        library[bucket]["n"] += 1
+class GameView:
+    """Lightweight read-only view of one GameStore row."""
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def _get(self, name):
+        return self.store.column(name)[self.row]
+
+    @property
+    def team(self):
+        return self.store.teams[self._get("team")]
+
+    @property
+    def opponent(self):
+        return self.store.teams[self._get("opp")]
+
+    @property
+    def week(self):
+        return int(self._get("week"))
+
+    @property
+    def result(self):
+        r = int(self._get("result"))
+        return None if r < 0 else RESULTS[r]
+
+    @property
+    def p_win(self):
+        p = float(self._get("p_win"))
+        return None if np.isnan(p) else p
+
+    def to_dict(self):
+        store, row = self.store, self.row
+        played = self.result is not None
+        coherence, conf = float(self._get("coherence")), float(self._get("conf"))
+        hist = int(self._get("hist"))
+        game = pack_game(
+            self.week, self.team, self.opponent, bool(self._get("is_home")),
+            int(self._get("pf")) if played else None, int(self._get("pa")) if played else None,
+            self.result, None if np.isnan(coherence) else coherence, self.p_win,
+            None if np.isnan(conf) else conf, None if hist < 0 else store.hists[hist],
+        )
+        for field, values in store.extras.items():
+            if values.get(row) is not None:
+                game[field] = values[row]
+        return game
 
-    # IMPORTANT: now we use week_num
-    weeks = sorted(sched["week_num"].dropna().astype(int).unique().tolist())
-
-    for week in weeks:
-        week_games = sched[sched["week_num"].astype(int) == week].copy()
-        pregame_records = []
-
-        for _, r in week_games.iterrows():
-            home = str(r["home_team"])
-            away = str(r["away_team"])
-
-            hs = r.get(home_col)
-            aw = r.get(away_col)
-            played = not (pd.isna(hs) or pd.isna(aw))
-
-            home_stats = team_stats_before_week(home, week)
-            away_stats = team_stats_before_week(away, week)
-
-            home_bucket = make_bucket(True, home_stats["pdpg"], away_stats["pdpg"], home_stats["form"], away_stats["form"])
-            home_hist = library_lookup(home_bucket)
-            home_hist_norm = None
-            home_p = None
-            home_conf = None
-            if home_hist and home_hist.get("n", 0) > 0:
-                n = home_hist["n"]
-                w_ = home_hist["W"] / n
-                l_ = home_hist["L"] / n
-                t_ = home_hist["T"] / n
-                home_hist_norm = {"n": n, "W": round(w_, 3), "L": round(l_, 3), "T": round(t_, 3)}
-                home_p = wl_expectation_from_hist(home_hist_norm)
-                home_conf = pregame_confidence(home_p, n)
-
-            away_bucket = make_bucket(False, away_stats["pdpg"], home_stats["pdpg"], away_stats["form"], home_stats["form"])
-            away_hist = library_lookup(away_bucket)
-            away_hist_norm = None
-            away_p = None
-            away_conf = None
-            if away_hist and away_hist.get("n", 0) > 0:
-                n = away_hist["n"]
-                w_ = away_hist["W"] / n
-                l_ = away_hist["L"] / n
-                t_ = away_hist["T"] / n
-                away_hist_norm = {"n": n, "W": round(w_, 3), "L": round(l_, 3), "T": round(t_, 3)}
-                away_p = wl_expectation_from_hist(away_hist_norm)
-                away_conf = pregame_confidence(away_p, n)
-
-            if played:
-                hs = int(hs)
-                aw = int(aw)
-                if hs > aw:
-                    home_res = "W"; away_res = "L"
-                elif hs < aw:
-                    home_res = "L"; away_res = "W"
-                else:
-                    home_res = "T"; away_res = "T"
-            else:
-                home_res = None
-                away_res = None
-
-            def pack_game(team, opp, is_home, pf, pa, result, p_win, conf, hist_norm, bucket):
-                coherence = None
-                if result is not None:
-                    pf_arr = np.array(team_pf_hist[team] + [pf], dtype=float)
-                    pa_arr = np.array(team_pa_hist[team] + [pa], dtype=float)
-                    off_score = to_score(zscore(pf_arr)[-1])
-                    def_score = to_score(zscore(-pa_arr)[-1])
-                    sig = np.array([off_score, def_score], dtype=float)
-
-                    if len(team_pf_hist[team]) >= 2:
-                        off_hist = [to_score(z) for z in zscore(np.array(team_pf_hist[team], dtype=float))]
-                        def_hist = [to_score(z) for z in zscore(-np.array(team_pa_hist[team], dtype=float))]
-                        mu = np.array([np.mean(off_hist), np.mean(def_hist)], dtype=float)
-                        sd = np.array([np.std(off_hist) + 1e-6, np.std(def_hist) + 1e-6], dtype=float)
-                    else:
-                        mu = sig
-                        sd = np.array([1.0, 1.0], dtype=float)
-
-                    dist = float(np.sqrt(np.mean(((sig - mu) / sd) ** 2)))
-                    coherence = round(clamp(95 - 25 * dist, 0, 100), 1)
-
-                pick = None
-                if p_win is not None:
-                    pick = "W" if p_win >= 0.5 else "L"
-
-                reality_lock = None
-                if result is not None and hist_norm and hist_norm.get("n", 0) > 0 and pick is not None:
-                    reality_lock = "MATCH" if result == pick else "DIVERGE"
-
-                wlc = win_loss_coherence_grade(conf, result, p_win)
-                explain_pre = explain_pregame(team, opp, is_home, p_win, conf, hist_norm)
-
-                if result is None:
-                    explain_post = "Upcoming game. Postgame coherence will appear after the game is played."
-                else:
-                    if hist_norm and hist_norm.get("n", 0) > 0:
-                        explain_post = (
-                            f"Postgame: coherence {coherence}. "
-                            f"Pregame expected win rate was ~{int(round(p_win*100))}% (n={hist_norm['n']}), "
-                            f"and reality lock is {reality_lock}."
-                        )
-                    else:
-                        explain_post = f"Postgame: coherence {coherence}. Oracle had insufficient similar-history pregame, so no reality lock was claimed."
-
-                return {
-                    "week": int(week),
-                    "opponent": opp,
-                    "result": result,
-                    "score": None if result is None else f"{pf}-{pa}",
-                    "oracle": {
-                        "pregame_pick": pick,
-                        "pregame_expected_win_rate": None if p_win is None else round(float(p_win), 3),
-                        "pregame_confidence": None if conf is None else round(float(conf), 1),
-                        "pregame_historical_map": hist_norm,
-                        "pregame_bucket": None,
-                        "explain_pregame": explain_pre,
-
-                        "coherence": coherence,
-                        "reality_lock": reality_lock,
-                        "win_loss_coherence": wlc,
-                        "explain": explain_post,
-                    }
-                }, bucket
-
-            if played:
-                home_pf, home_pa = hs, aw
-                away_pf, away_pa = aw, hs
-            else:
-                home_pf = home_pa = away_pf = away_pa = None
-
-            home_game, home_bucket_for_update = pack_game(home, away, True, home_pf, home_pa, home_res, home_p, home_conf, home_hist_norm, home_bucket)
-            away_game, away_bucket_for_update = pack_game(away, home, False, away_pf, away_pa, away_res, away_p, away_conf, away_hist_norm, away_bucket)
-
-            team_out[home]["games"].append(home_game)
-            team_out[away]["games"].append(away_game)
-
-            if played:
-                pregame_records.append((home_bucket_for_update, home_res))
-                pregame_records.append((away_bucket_for_update, away_res))
-
-        # Update the league library AFTER the week (no leakage within same week_num)
-        for bucket, res in pregame_records:
-            library_update(bucket, res)
-
-        # Update per-team histories from played games in this week
-        for _, r in week_games.iterrows():
-            home = str(r["home_team"])
-            away = str(r["away_team"])
-            hs = r.get(home_col)
-            aw = r.get(away_col)
-            if pd.isna(hs) or pd.isna(aw):
-                continue
+def _week_batches(sched: pd.DataFrame, home_col: str, away_col: str):
+    """
+    Split the prepared schedule into per-week_num batches of plain NumPy
+    column arrays (one groupby, no per-week boolean masks / row Series).
+    """
+    import pandas as pd
+    game_id = sched["game_id"].astype(str).to_numpy() if "game_id" in sched.columns else np.full(len(sched), "", dtype=object)
+    home = sched["home_team"].astype(str).to_numpy()
+    away = sched["away_team"].astype(str).to_numpy()
+    hs = pd.to_numeric(sched[home_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    aw = pd.to_numeric(sched[away_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+    batches = []
+    for week, idx in sorted(sched.groupby("week_num", sort=True).indices.items()):
+        batches.append((int(week), {
+            "game_id": game_id[idx],
+            "home": home[idx],
+            "away": away[idx],
+            "hs": hs[idx],
+            "as": aw[idx],
+        }))
+    return batches
+
+def _week_records(state, week, batch):
+    """
+    Season-local half of a week: pregame team-form buckets, results and
+    postgame coherence for every team-game (home then away, schedule order),
+    then the team histories learn the week's scores. Never reads the library,
+    so whole seasons of records can be built independently.
+    Returns [(team, opp, is_home, pf, pa, result, coherence, bucket, features), ...]
+    where features is the continuous (is_home, team_strength, opp_strength, team_form, opp_form);
+    strength is pdpg, or the SRS rating from every earlier game when state["ratings"] is set.
+    """
+    team_moments = state["team_moments"]
+    ratings = state.get("ratings")
+    rating = ratings.solve()[0] if ratings is not None else None
+    records = []
+    played_games = []
+
+    for home, away, hs, aw in zip(batch["home"].tolist(), batch["away"].tolist(), batch["hs"].tolist(), batch["as"].tolist()):
+        played = not (np.isnan(hs) or np.isnan(aw))
+
+        home_stats = team_stats_before_week(state, home, week)
+        away_stats = team_stats_before_week(state, away, week)
+
+        if rating is None:
+            home_str, away_str = home_stats["pdpg"], away_stats["pdpg"]
+        else:
+            home_str, away_str = rating[home], rating[away]
+        home_feats = (1.0, home_str, away_str, home_stats["form"], away_stats["form"])
+        away_feats = (0.0, away_str, home_str, away_stats["form"], home_stats["form"])
+        home_bucket = make_bucket(*home_feats)
+        away_bucket = make_bucket(*away_feats)
+
+        if played:
             hs = int(hs)
             aw = int(aw)
             if hs > aw:
-                home_res, away_res = "W", "L"
+                home_res = "W"; away_res = "L"
             elif hs < aw:
-                home_res, away_res = "L", "W"
+                home_res = "L"; away_res = "W"
             else:
-                home_res = away_res = "T"
+                home_res = "T"; away_res = "T"
+            played_games.append((home, away, hs, aw))
+            home_coh = coherence_streaming(team_moments[home]["pf"], team_moments[home]["pa"], hs, aw)
+            away_coh = coherence_streaming(team_moments[away]["pf"], team_moments[away]["pa"], aw, hs)
+            records.append((home, away, True, hs, aw, home_res, home_coh, home_bucket, home_feats))
+            records.append((away, home, False, aw, hs, away_res, away_coh, away_bucket, away_feats))
+        else:
+            records.append((home, away, True, None, None, None, None, home_bucket, home_feats))
+            records.append((away, home, False, None, None, None, None, away_bucket, away_feats))
+
+    # Update per-team histories from played games in this week
+    team_games_hist = state["team_games_hist"]
+    for home, away, hs, aw in played_games:
+        team_games_hist[home].append(week, hs, aw)
+        team_games_hist[away].append(week, aw, hs)
+
+        team_moments[home]["pf"].push(hs); team_moments[home]["pa"].push(aw)
+        team_moments[away]["pf"].push(aw); team_moments[away]["pa"].push(hs)
+        if ratings is not None:
+            ratings.add_game(home, away, hs - aw)
+
+    return records
+
+def _fold_week(state, week, records, metrics=None):
+    """
+    Library half of a week: pregame reads from the league library (or the
+    k-NN index in lookup="knn" mode; prior weeks only), append every team-game
+    to state["games"], then the library/index learn this week's results.
+    """
+    if state.get("lookup") == "knn":
+        reads = _knn_reads(state, [rec[8] for rec in records])
+    else:
+        reads = _pregame_reads(state, [rec[7] for rec in records])
+    store = state["games"]
+    first_row = len(store)
+    store.append_week(week, records, reads)
+    if state.get("strength") == "srs":
+        store.extras.setdefault("pregame_rating", {})
+        for row, rec in enumerate(records, first_row):
+            store.set_extra("pregame_rating", row, {"team": round(rec[8][1], 2), "opponent": round(rec[8][2], 2)})
+    hits = sum(hist_norm is not None for hist_norm, _, _ in reads)
+
+    played = [rec for rec in records if rec[5] is not None]
+    pregame_records = [(rec[7], rec[5]) for rec in played]
+    knn_records = [(rec[8], rec[5]) for rec in played]
+
+    # Update the league library AFTER the week (no leakage within same week_num)
+    if pregame_records:
+        state["library"].update_many(*zip(*pregame_records))
+        if state.get("knn") is not None:
+            state["knn"].add_many(*zip(*knn_records))
+
+    if metrics is not None:
+        metrics.week(week, games=len(records) // 2, played=len(pregame_records) // 2,
+                     library_hits=hits, library_misses=len(records) - hits, library_buckets=len(state["library"]))
+
+def _replay_week(state, week, batch, metrics=None):
+    """
+    Advance the oracle state by one week_num: pregame reads + packed games for
+    every matchup, then the library and team histories learn from played games.
+    """
+    _fold_week(state, week, _week_records(state, week, batch), metrics)
+
+def _checkpoint_header(season, all_teams, prior_digest, lookup, strength="pdpg") -> dict:
+    return {
+        "version": CHECKPOINT_VERSION,
+        "code": _code_fingerprint(),
+        "season": season,
+        "teams": list(all_teams),
+        "prior_library": prior_digest,
+        "lookup": lookup,
+        "strength": strength,
+    }
+
+def _resume_replay(batches, saved, fresh_state, keep_snapshots=True, metrics=None):
+    """
+    Replay from the first week whose games/scores differ from the per-week
+    snapshots in `saved` ([{"week", "fingerprint", "state"}], oldest first);
+    fresh_state() starts the season when nothing matches.
+    Returns (state, snapshots, resume) where resume is the number of weeks reused.
+    """
+    weeks = [week for week, _ in batches]
+    fingerprints = [_week_fingerprint(batch) for _, batch in batches]
+
+    # Longest prefix of weeks whose inputs match the snapshots exactly
+    resume = 0
+    while (
+        resume < len(weeks)
+        and resume < len(saved)
+        and saved[resume]["week"] == weeks[resume]
+        and saved[resume]["fingerprint"] == fingerprints[resume]
+    ):
+        resume += 1
+
+    state = None
+    if resume > 0:
+        try:
+            state = _restore(saved[resume - 1]["state"])
+        except Exception as e:
+            # e.g. classes pickled under __main__ by a CLI run, read back by an importing process
+            print(f"[oracle] checkpointed week {saved[resume - 1]['week']} unreadable ({type(e).__name__}: {e}); "
+                  "replaying from week 1.")
+            resume = 0
+    if state is None:
+        state = fresh_state()
+    snapshots = saved[:resume]
+
+    with (metrics.profiled() if metrics is not None else contextlib.nullcontext()):
+        for i in range(resume, len(weeks)):
+            week, batch = batches[i]
+            _replay_week(state, week, batch, metrics)
+            if keep_snapshots:
+                snapshots.append({"week": week, "fingerprint": fingerprints[i], "state": _snapshot(state)})
+
+    return state, snapshots, resume
+
+def _replay_season(sched, season, all_teams, home_col, away_col, checkpoint_path=None, metrics=None, lookup="bucket",
+                   strength="pdpg"):
+    """
+    Replay the season week by week, resuming from the checkpoint at the last
+    week whose games/scores are unchanged since the previous run. The library
+    starts from the one saved through season - 1 by a backfill, if any.
+    Returns the final state.
+    """
+    fresh, prior_digest = _season_start(season, all_teams, lookup, strength)
+
+    # IMPORTANT: now we use week_num
+    batches = _week_batches(sched, home_col, away_col)
+    header = _checkpoint_header(season, all_teams, prior_digest, lookup, strength)
+    saved = _load_checkpoint(checkpoint_path, header) if checkpoint_path else []
+
+    state, snapshots, resume = _resume_replay(batches, saved, fresh, keep_snapshots=bool(checkpoint_path),
+                                              metrics=metrics)
+
+    n_weeks = len(batches)
+    if metrics is not None:
+        metrics.info["weeks_reused"] = resume
+        metrics.info["weeks_replayed"] = n_weeks - resume
+
+    print(f"[oracle] season {season}: reused {resume}/{n_weeks} checkpointed weeks, replayed {n_weeks - resume}.")
+
+    if checkpoint_path and (resume < n_weeks or len(saved) != n_weeks):
+        _save_checkpoint(checkpoint_path, header, snapshots)
+
+    return state
+
+# ------------------------- Schedule source + local Parquet cache -------------------------
+
+SCHEDULE_CACHE_DIR = CACHE_DIR / "schedules"
+
+def _schedule_index_path() -> Path:
+    return SCHEDULE_CACHE_DIR / "index.json"
+
+def _read_schedule_index() -> dict:
+    try:
+        return json.loads(_schedule_index_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+@contextlib.contextmanager
+def _schedule_index_lock():
+    # --seasons workers update the index concurrently; serialize each read-modify-write
+    try:
+        import fcntl
+    except ImportError:     # no advisory locks (Windows): a racing worker may drop an entry
+        fcntl = None
+    SCHEDULE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(SCHEDULE_CACHE_DIR / ".index.lock", "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+def _schedule_content_hash(sched: pd.DataFrame) -> str:
+    import pandas as pd
+    h = hashlib.sha256("\x1f".join(map(str, sched.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(sched, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def _schedule_is_complete(sched: pd.DataFrame) -> bool:
+    # Every real game has a final score => nothing left to fetch for this season
+    home_col = _first_existing(sched, ["home_score", "home_points"])
+    away_col = _first_existing(sched, ["away_score", "away_points"])
+    if home_col is None or away_col is None:
+        return False
+    real = _filter_real_games_only(sched)
+    return bool(len(real)) and not (real[home_col].isna().any() or real[away_col].isna().any())
+
+def _read_cached_schedule(season: int):
+    import pandas as pd
+    entry = _read_schedule_index().get(str(season))
+    if not entry:
+        return None, None
+    path = SCHEDULE_CACHE_DIR / entry["file"]
+    if not path.exists():
+        return None, None
+    return pd.read_parquet(path), entry
+
+def _store_cached_schedule(season: int, sched: pd.DataFrame, current_season: int):
+    """
+    Write .oracle_cache/schedules/season<season>-<hash>.parquet and point the index at
+    it. A no-op when the content hash already matches the cached copy.
+    """
+    digest = _schedule_content_hash(sched)
+    index = _read_schedule_index()
+    old = index.get(str(season))
+    if old and old.get("sha256") == digest and (SCHEDULE_CACHE_DIR / old["file"]).exists():
+        return
+
+    SCHEDULE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fname = f"season{season}-{digest[:12]}.parquet"
+    _atomic_write_bytes(SCHEDULE_CACHE_DIR / fname, sched.to_parquet(index=False))
+
+    with _schedule_index_lock():
+        index = _read_schedule_index()
+        old = index.get(str(season))
+        index[str(season)] = {
+            "file": fname,
+            "sha256": digest,
+            "complete": season < current_season and _schedule_is_complete(sched),
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        _atomic_write_text(_schedule_index_path(), json.dumps(index, indent=2, sort_keys=True))
+
+    if old and old.get("file") != fname:
+        (SCHEDULE_CACHE_DIR / old["file"]).unlink(missing_ok=True)
+
+def _read_schedule_fixture(path: Path, season: int) -> pd.DataFrame:
+    """
+    Local stand-in for nflreadpy.load_schedules: a Parquet or CSV file in the
+    same column shape, optionally holding several seasons.
+    """
+    import pandas as pd
+    path = Path(path)
+    df = pd.read_csv(path) if path.suffix.lower() == ".csv" else pd.read_parquet(path)
+    if "season" in df.columns:
+        df = df[pd.to_numeric(df["season"], errors="coerce") == season].reset_index(drop=True)
+    if df.empty:
+        raise RuntimeError(f"Schedule fixture {path} has no rows for season {season}.")
+    return df
 
-            team_games_hist[home].append({"week": int(week), "pf": hs, "pa": aw, "result": home_res})
-            team_games_hist[away].append({"week": int(week), "pf": aw, "pa": hs, "result": away_res})
+def load_schedule(season: int, offline=False, fixture=None, current_season=SEASON) -> pd.DataFrame:
+    """
+    Schedule for one season, in nflreadpy's column shape.
+      - fixture: read a local file instead of the network (tests / isolated boxes)
+      - completed past seasons come straight from the Parquet cache
+      - otherwise fetch, refresh the cache, and fall back to it if the fetch fails
+      - offline: never touch the network; cache (or fixture) only
+    """
+    if fixture is not None:
+        return _read_schedule_fixture(fixture, season)
 
-            team_pf_hist[home].append(hs); team_pa_hist[home].append(aw)
-            team_pf_hist[away].append(aw); team_pa_hist[away].append(hs)
+    cached, entry = _read_cached_schedule(season)
+    if cached is not None and (offline or entry.get("complete")):
+        return cached
+    if offline:
+        raise RuntimeError(f"--offline: no cached schedule for season {season} in {SCHEDULE_CACHE_DIR}.")
+
+    try:
+        # Load schedule (polars -> pandas). pyarrow required.
+        import nflreadpy as nfl
+        sched = nfl.load_schedules([season]).to_pandas()
+    except Exception as e:
+        if cached is None:
+            raise
+        print(f"[oracle] schedule fetch for {season} failed ({e}); using cached copy from {entry.get('fetched_at')}.")
+        return cached
+
+    _store_cached_schedule(season, sched, current_season)
+    return sched
+
+# ------------------------- Play-by-play efficiency features (optional) -------------------------
+
+PBP_CACHE_DIR = CACHE_DIR / "pbp"
+# Same release asset nflreadpy.load_pbp reads, streamed to disk instead of into memory
+PBP_URL = "https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_{season}.parquet"
+# The only play-by-play columns ever materialized (of ~370)
+PBP_COLUMNS = ["game_id", "posteam", "defteam", "play_type", "epa", "success", "interception", "fumble_lost"]
+PBP_PLAY_TYPES = ["pass", "run"]
+PBP_BATCH_ROWS = 65_536
+# Per team-game sums kept in the cache; rates are derived when read so that
+# season-to-date values weight every play equally
+PBP_SUMS = ["plays", "epa", "success", "giveaways", "def_plays", "def_epa", "def_success", "takeaways"]
+
+def _pbp_features_path(season: int) -> Path:
+    return PBP_CACHE_DIR / f"features_{season}.parquet"
+
+def _read_pbp_features(season: int) -> pd.DataFrame:
+    import pandas as pd
+    try:
+        return pd.read_parquet(_pbp_features_path(season))
+    except (OSError, ValueError):
+        return pd.DataFrame(columns=["game_id", "team", "opp"] + PBP_SUMS)
+
+def _download_pbp(season: int) -> Path:
+    """Stream the season's play-by-play Parquet to .oracle_cache/pbp/ in 1 MiB chunks."""
+    import urllib.request
+
+    PBP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PBP_CACHE_DIR / f"play_by_play_{season}.parquet"
+    # urlopen raises HTTPError on a non-2xx status
+    with urllib.request.urlopen(PBP_URL.format(season=season), timeout=60) as r, _atomic_open(path) as f:
+        shutil.copyfileobj(r, f, 1 << 20)
+    return path
+
+def _aggregate_pbp(path: Path, season: int, game_ids) -> pd.DataFrame:
+    """
+    Per (game_id, team, opp) offensive sums over the wanted games, reading
+    PBP_BATCH_ROWS rows of PBP_COLUMNS at a time; memory is bounded by one
+    batch plus one row per team-game, whatever the file size.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    names = set(pf.schema_arrow.names)
+    missing = [c for c in PBP_COLUMNS if c not in names]
+    if missing:
+        raise RuntimeError(f"Play-by-play file {path} is missing columns: {missing}")
+    columns = PBP_COLUMNS + (["season"] if "season" in names else [])
+    wanted = pa.array(sorted(game_ids), type=pa.string())
+
+    acc = None
+    for batch in pf.iter_batches(batch_size=PBP_BATCH_ROWS, columns=columns):
+        mask = pc.and_(
+            pc.is_in(pc.cast(batch.column("game_id"), pa.string()), value_set=wanted),
+            pc.is_in(batch.column("play_type"), value_set=pa.array(PBP_PLAY_TYPES)),
+        )
+        if "season" in columns:
+            mask = pc.and_(mask, pc.equal(batch.column("season"), season))
+        df = batch.filter(mask).to_pandas()
+        df = df[df["posteam"].notna() & df["defteam"].notna() & df["epa"].notna()]
+        if df.empty:
+            continue
+        part = pd.DataFrame({
+            "game_id": df["game_id"].astype(str),
+            "team": df["posteam"].astype(str),
+            "opp": df["defteam"].astype(str),
+            "plays": 1.0,
+            "epa": df["epa"].astype(float),
+            "success": df["success"].fillna(0).astype(float),
+            "giveaways": df["interception"].fillna(0).astype(float) + df["fumble_lost"].fillna(0).astype(float),
+        }).groupby(["game_id", "team", "opp"], sort=False).sum()
+        acc = part if acc is None else acc.add(part, fill_value=0.0)
+
+    if acc is None:
+        return pd.DataFrame(columns=["game_id", "team", "opp"] + PBP_SUMS)
+
+    # Mirror each offense onto its opponent's defensive columns
+    off = acc.reset_index()
+    defense = off.rename(columns={
+        "team": "opp", "opp": "team", "plays": "def_plays", "epa": "def_epa",
+        "success": "def_success", "giveaways": "takeaways",
+    })
+    games = off.merge(defense, on=["game_id", "team", "opp"], how="outer")
+    return games[["game_id", "team", "opp"] + PBP_SUMS].fillna(0.0)
+
+def load_pbp_features(season: int, sched: pd.DataFrame, home_col: str, away_col: str, offline=False, fixture=None):
+    """
+    Per team-game play-by-play sums for every final game in the prepared
+    schedule (columns: game_id, team, opp, week_num + PBP_SUMS).
+
+    Finished games are cached in .oracle_cache/pbp/features_<season>.parquet and
+    never aggregated again; the play-by-play file is only read (downloaded
+    unless `fixture` names a local one) when a final game is missing from it.
+    """
+    import pandas as pd
+    final = sched[sched[home_col].notna() & sched[away_col].notna()]
+    cached = _read_pbp_features(season)
+    needed = set(final["game_id"].astype(str)) - set(cached["game_id"].astype(str))
+
+    if needed and offline and fixture is None:
+        print(f"[oracle] play-by-play {season}: {len(needed)} final game(s) not fetched yet (offline).")
+    elif needed:
+        path = Path(fixture) if fixture is not None else _download_pbp(season)
+        fresh = _aggregate_pbp(path, season, needed)
+        if fixture is None:
+            path.unlink(missing_ok=True)
+        lagging = len(needed - set(fresh["game_id"]))
+        print(f"[oracle] play-by-play {season}: aggregated {fresh['game_id'].nunique()} new game(s), "
+              f"{cached['game_id'].nunique()} cached" + (f", {lagging} not published yet." if lagging else "."))
+        if len(fresh):
+            cached = pd.concat([cached, fresh], ignore_index=True) if len(cached) else fresh
+            PBP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _atomic_write_bytes(_pbp_features_path(season), cached.to_parquet(index=False))
+
+    weeks = sched[["game_id", "week_num"]].astype({"game_id": str})
+    return cached.astype({"game_id": str}).merge(weeks, on="game_id", how="inner")
+
+def _efficiency(sums):
+    """Rates from one PBP_SUMS vector (a game, or a season-to-date total over `games`)."""
+    plays, epa, success, give, d_plays, d_epa, d_success, take, games = sums
+    return {
+        "games": int(games),
+        "epa_per_play": round(epa / plays, 3) if plays else None,
+        "success_rate": round(success / plays, 3) if plays else None,
+        "def_epa_per_play": round(d_epa / d_plays, 3) if d_plays else None,
+        "def_success_rate": round(d_success / d_plays, 3) if d_plays else None,
+        "turnover_margin": round((take - give) / games, 2),
+    }
+
+def attach_efficiency(store, features: pd.DataFrame):
+    """
+    Give each played game an "efficiency" and every game a "pregame_efficiency" block
+    (season-to-date for the team and its opponent, weeks before the game only)
+    to the packed games. Season-to-date is a prefix of a per-team cumulative
+    sum, keyed by week_num like TeamHistory.
+    """
+    history = {}
+    for team, rows in features.sort_values("week_num").groupby("team", sort=False):
+        sums = np.column_stack([rows[PBP_SUMS].to_numpy(dtype=float), np.ones(len(rows))])
+        history[team] = (rows["week_num"].astype(int).tolist(),
+                         np.vstack([np.zeros(sums.shape[1]), np.cumsum(sums, axis=0)]), sums)
+
+    def before(team, week):
+        if team not in history:
+            return None
+        weeks, cum, _ = history[team]
+        n = bisect.bisect_left(weeks, week)
+        return _efficiency(cum[n]) if n else None
+
+    store.extras.setdefault("efficiency", {})
+    store.extras.setdefault("pregame_efficiency", {})
+    for row in range(len(store)):
+        g = store.view(row)
+        h = history.get(g.team)
+        if h is not None and g.result is not None:
+            i = bisect.bisect_left(h[0], g.week)
+            if i < len(h[0]) and h[0][i] == g.week:
+                store.set_extra("efficiency", row, _efficiency(h[2][i]))
+        store.set_extra("pregame_efficiency", row,
+                        {"team": before(g.team, g.week), "opponent": before(g.opponent, g.week)})
+
+# ------------------------- Rest-of-season simulation -------------------------
+
+# Current 8-division alignment (2002+); relocated franchises keep their division
+NFL_DIVISIONS = {
+    "AFC East": ("BUF", "MIA", "NE", "NYJ"),
+    "AFC North": ("BAL", "CIN", "CLE", "PIT"),
+    "AFC South": ("HOU", "IND", "JAX", "TEN"),
+    "AFC West": ("DEN", "KC", "LAC", "LV", "OAK", "SD"),
+    "NFC East": ("DAL", "NYG", "PHI", "WAS"),
+    "NFC North": ("CHI", "DET", "GB", "MIN"),
+    "NFC South": ("ATL", "CAR", "NO", "TB"),
+    "NFC West": ("ARI", "LAR", "SEA", "SF", "STL"),
+}
+SIM_FIRST_SEASON = 2002
+SIM_RUNS = 100_000
+SIM_CHUNK = 25_000          # simulated seasons per draw matrix (bounds memory)
+# Home win probability for games neither side has a pregame read for
+# (long-run NFL home-field rate)
+SIM_HOME_PRIOR = 0.55
+
+def _playoff_wildcards(season: int) -> int:
+    # 7-team conference brackets since 2020, 6 before
+    return 3 if season >= 2020 else 2
+
+def _regular_season_mask(sched: pd.DataFrame) -> np.ndarray:
+    if _first_existing(sched, ["game_type", "season_type"]):
+        return (_game_type_token(sched) == "REG").to_numpy()
+    return (sched["week_num"] < min(POST_ROUND_TOKENS.values())).to_numpy()
+
+def _sim_home_probs(store, weeks, homes, aways):
+    """
+    Home win probability per unplayed game from both sides' pregame reads:
+    the mean of p_home and 1 - p_away, whichever exist, else SIM_HOME_PRIOR.
+    """
+    reads = {}
+    for row in np.flatnonzero(store.column("result") < 0).tolist():
+        g = store.view(row)
+        p = g.p_win
+        reads[(g.team, g.week, g.opponent)] = None if p is None else round(p, 3)
+    probs = []
+    for week, home, away in zip(weeks, homes, aways):
+        sides = [reads.get((home, week, away)), reads.get((away, week, home))]
+        sides = [p for p in (sides[0], None if sides[1] is None else 1.0 - sides[1]) if p is not None]
+        probs.append(sum(sides) / len(sides) if sides else SIM_HOME_PRIOR)
+    return np.array(probs, dtype=float)
+
+def simulate_season(sched, season, all_teams, home_col, away_col, store, runs=SIM_RUNS, seed=None):
+    """
+    Monte Carlo the unplayed regular-season games `runs` times from the
+    pregame win probabilities. Each chunk of runs is one (runs x games)
+    uniform draw matrix; wins per team are a matmul against the home/away
+    incidence, and division / conference standings are batched argsorts
+    (ties in win pct broken at random, no NFL tiebreakers).
+    Returns {team: distribution} or {} when there is nothing to simulate.
+    """
+    import pandas as pd
+    if runs <= 0 or season < SIM_FIRST_SEASON:
+        return {}
+    reg = sched[_regular_season_mask(sched)]
+    hs = pd.to_numeric(reg[home_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    aw = pd.to_numeric(reg[away_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    played = ~(np.isnan(hs) | np.isnan(aw))
+    if played.all():
+        return {}
+
+    division_of = {t: d for d, members in NFL_DIVISIONS.items() for t in members}
+    missing = [t for t in all_teams if t not in division_of]
+    if missing:
+        print(f"[oracle] simulation skipped: no division for {', '.join(missing)}.")
+        return {}
+
+    teams = list(all_teams)
+    ix = {t: i for i, t in enumerate(teams)}
+    n_teams = len(teams)
+    home_ix = reg["home_team"].map(ix).to_numpy()
+    away_ix = reg["away_team"].map(ix).to_numpy()
+
+    # Banked record from played games
+    base_w = np.zeros(n_teams)
+    base_l = np.zeros(n_teams)
+    base_t = np.zeros(n_teams)
+    h, a = home_ix[played], away_ix[played]
+    np.add.at(base_w, h, hs[played] > aw[played]); np.add.at(base_w, a, aw[played] > hs[played])
+    np.add.at(base_l, h, hs[played] < aw[played]); np.add.at(base_l, a, aw[played] < hs[played])
+    np.add.at(base_t, h, hs[played] == aw[played]); np.add.at(base_t, a, hs[played] == aw[played])
+
+    todo = ~played
+    h, a = home_ix[todo], away_ix[todo]
+    p_home = _sim_home_probs(store, reg["week_num"].to_numpy()[todo].tolist(),
+                             reg["home_team"].to_numpy()[todo].tolist(), reg["away_team"].to_numpy()[todo].tolist())
+    n_games = len(p_home)
+    # wins = home_won @ (H - A) + A.sum(0): home_won picks the home team, else the away team
+    home_inc = np.zeros((n_games, n_teams), dtype=np.float32)
+    away_inc = np.zeros((n_games, n_teams), dtype=np.float32)
+    home_inc[np.arange(n_games), h] = 1
+    away_inc[np.arange(n_games), a] = 1
+    swing = home_inc - away_inc
+    away_all = away_inc.sum(axis=0)
+    left = (home_inc + away_inc).sum(axis=0)
+    games = base_w + base_l + base_t + left
+
+    div_cols = {}
+    for t in teams:
+        div_cols.setdefault(division_of[t], []).append(ix[t])
+    conf_cols = {}
+    for d, cols in div_cols.items():
+        conf_cols.setdefault(d.split()[0], []).append(cols)
+    max_div = max(len(c) for c in div_cols.values())
+    wildcards = _playoff_wildcards(season)
+
+    rng = np.random.default_rng(season if seed is None else seed)
+    win_counts = np.zeros((n_teams, int(left.max()) + 1), dtype=np.int64)
+    rank_counts = np.zeros((n_teams, max_div), dtype=np.int64)
+    playoff_counts = np.zeros(n_teams, dtype=np.int64)
+
+    done = 0
+    while done < runs:
+        n = min(SIM_CHUNK, runs - done)
+        home_won = (rng.random((n, n_games)) < p_home).astype(np.float32)
+        sim_w = np.rint(home_won @ swing + away_all).astype(np.int64)           # (n, teams)
+        key = (base_w + sim_w + 0.5 * base_t) / games + 1e-4 * rng.random((n, n_teams))
+
+        div_rank = np.empty((n, n_teams), dtype=np.int64)
+        for cols in div_cols.values():
+            div_rank[:, cols] = np.argsort(np.argsort(-key[:, cols], axis=1), axis=1)
+        # division winners first, then the best of the rest for the wildcard spots
+        seed_key = key + (div_rank == 0)
+        for groups in conf_cols.values():
+            cols = [c for g in groups for c in g]
+            conf_rank = np.argsort(np.argsort(-seed_key[:, cols], axis=1), axis=1)
+            playoff_counts[cols] += (conf_rank < len(groups) + wildcards).sum(axis=0)
+
+        for t in range(n_teams):
+            win_counts[t] += np.bincount(sim_w[:, t], minlength=win_counts.shape[1])
+            rank_counts[t] += np.bincount(div_rank[:, t], minlength=max_div)
+        done += n
+
+    out = {}
+    for t in teams:
+        i = ix[t]
+        w0, l0, t0, left_i = int(base_w[i]), int(base_l[i]), int(base_t[i]), int(left[i])
+        share = win_counts[i] / runs
+        records = {
+            f"{w0 + k}-{l0 + left_i - k}-{t0}": round(float(share[k]), 4)
+            for k in range(left_i, -1, -1) if share[k] > 0
+        }
+        ranks = rank_counts[i, :len(div_cols[division_of[t]])] / runs
+        out[t] = {
+            "runs": runs,
+            "games_left": left_i,
+            "division": division_of[t],
+            "expected_wins": round(w0 + float(np.dot(np.arange(len(share)), share)), 2),
+            "record": records,
+            "division_rank": [round(float(r), 4) for r in ranks],
+            "division_title": round(float(ranks[0]), 4),
+            "playoffs": round(float(playoff_counts[i] / runs), 4),
+        }
+    return out
+
+# ------------------------- Outputs -------------------------
+
+def _team_payload(t, store, season, generated_at, simulation=None, rating=None):
+    summary = store.summaries()[t]
+    payload = {
+        "summary": {
+            "team": t,
+            "season": season,
+            "record": summary["record"],
+            "win_pct": summary["win_pct"],
+            "calibration_score": summary["calibration_score"],
+            "calibration_trail": summary["calibration_trail"],
+            "note": "Pregame confidence is learned league-wide from prior weeks only (no same-week leakage)."
+        },
+        "generated_at": generated_at,
+        "games": store.game_dicts(t)
+    }
+    if rating is not None:
+        payload["summary"]["rating"] = rating
+    if simulation is not None:
+        payload["simulation"] = simulation
+    return payload
+
+BUNDLE_FORMAT = "oracle-league-bundle/1"
+
+def _league_bundle(payloads, season, generated_at):
+    """
+    One league-wide payload for the visualizer. Games are stored column-wise
+    (one array per field, "oracle.<field>" for nested oracle fields), with
+    repeated strings (team codes, explanations) and small repeated objects
+    (historical maps, W/L grades) interned into shared tables.
+    """
+    strings, string_ix = [], {}
+    objects, object_ix = [], {}
+
+    def intern_str(v):
+        if v not in string_ix:
+            string_ix[v] = len(strings)
+            strings.append(v)
+        return string_ix[v]
+
+    def intern_obj(v):
+        k = json.dumps(v, sort_keys=True)
+        if k not in object_ix:
+            object_ix[k] = len(objects)
+            objects.append(v)
+        return object_ix[k]
+
+    fields = []
+    rows = []
+    teams = []
+    for t, key, payload in payloads:
+        entry = {
+            "team": intern_str(t),
+            "key": key,
+            "summary": payload["summary"],
+            "start": len(rows),
+            "count": len(payload["games"]),
+        }
+        if "simulation" in payload:
+            entry["simulation"] = payload["simulation"]
+        teams.append(entry)
+        for g in payload["games"]:
+            row = {}
+            for k, v in g.items():
+                if k == "oracle":
+                    for ok, ov in v.items():
+                        row[f"oracle.{ok}"] = ov
+                else:
+                    row[k] = v
+            for f in row:
+                if f not in fields:
+                    fields.append(f)
+            rows.append(row)
+
+    columns = {}
+    for f in fields:
+        values = [r.get(f) for r in rows]
+        present = [v for v in values if v is not None]
+        if present and all(isinstance(v, str) for v in present):
+            columns[f] = {"enc": "str", "data": [None if v is None else intern_str(v) for v in values]}
+        elif present and all(isinstance(v, (dict, list)) for v in present):
+            columns[f] = {"enc": "obj", "data": [None if v is None else intern_obj(v) for v in values]}
+        else:
+            columns[f] = {"enc": "plain", "data": values}
+
+    return {
+        "format": BUNDLE_FORMAT,
+        "season": season,
+        "generated_at": generated_at,
+        "fields": fields,
+        "strings": strings,
+        "objects": objects,
+        "teams": teams,
+        "columns": columns,
+    }
+
+def _write_compressed_siblings(path: Path):
+    """
+    <name>.gz (and <name>.br when the optional brotli package is installed)
+    next to path, for hosts that serve precompressed files.
+    """
+    raw = path.read_bytes()
+    # mtime=0 keeps the .gz byte-identical across runs with identical content
+    _atomic_write_bytes(path.with_name(path.name + ".gz"), gzip.compress(raw, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    _atomic_write_bytes(path.with_name(path.name + ".br"), brotli.compress(raw, quality=11))
+
+def _write_league_bundle(payloads, season, generated_at, out_dir=None) -> bool:
+    path = (OUT_DIR if out_dir is None else out_dir) / "league.json"
+    bundle = _league_bundle(payloads, season, generated_at)
+    if _existing_digest(path) == _substantive_digest(bundle) and path.with_name(path.name + ".gz").exists():
+        return False
+    _atomic_write_text(path, json.dumps(bundle, separators=(",", ":")))
+    _write_compressed_siblings(path)
+    return True
+
+def _write_outputs(state, all_teams, season, out_dir=None, teams=None):
+    """
+    teams.json, per-team JSONs and the league bundle. `teams` limits the
+    per-team files considered to that subset (watch mode); the bundle always
+    carries every team.
+    """
+    out_dir = OUT_DIR if out_dir is None else out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    store = state["games"]
+    simulation = state.get("simulation") or {}
+    ratings = state.get("rating_summary") or {}
+    generated_at = datetime.now(timezone.utc).isoformat()
 
     # --- Write teams.json ---
     # IMPORTANT: "key" is what the visualizer uses to fetch ./<key>.json
     teams_payload = [{"team": t, "key": _alias(t)} for t in all_teams]
-    _write_json(OUT_DIR / "teams.json", {"season": SEASON, "teams": teams_payload})
+    _write_json(out_dir / "teams.json", {"season": season, "teams": teams_payload})
+    changed = []
+    payloads = []
 
-    # --- Write per-team JSONs (plus alias copies) ---
+    # --- Write per-team JSONs (plus alias copies and hashed twins) ---
+    considered = set(all_teams if teams is None else teams)
+    hashed = {}
     for t in all_teams:
-        games = sorted(team_out[t]["games"], key=lambda g: g["week"])
-        played = [g for g in games if g["result"] is not None]
-
-        w = sum(1 for g in played if g["result"] == "W")
-        l = sum(1 for g in played if g["result"] == "L")
-        ti = sum(1 for g in played if g["result"] == "T")
-        n = len(played)
-        win_pct = (w + 0.5 * ti) / n if n else None
-
-        locks = [g["oracle"].get("reality_lock") for g in played]
-        cal = 0
-        trail = []
-        for lk in locks:
-            if lk == "MATCH":
-                cal += 1
-            elif lk == "DIVERGE":
-                cal -= 1
-            trail.append(cal)
-
-        payload = {
-            "summary": {
-                "team": t,
-                "season": SEASON,
-                "record": f"{w}-{l}-{ti}",
-                "win_pct": None if win_pct is None else round(float(win_pct), 3),
-                "calibration_score": cal,
-                "calibration_trail": trail,
-                "note": "Pregame confidence is learned league-wide from prior weeks only (no same-week leakage)."
-            },
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "games": games
-        }
-
+        payload = _team_payload(t, store, season, generated_at, simulation.get(t), ratings.get(t))
         key = _alias(t)
-        _write_with_alias_copies(key, payload)
+        payloads.append((t, key, payload))
+        if t in considered and _write_with_alias_copies(key, payload, out_dir):
+            changed.append(key)
+        name = _link_hashed(out_dir / f"{key}.json")
+        for k in [key] + _alias_keys(key):
+            hashed[k] = name
+
+    print(f"[oracle] {out_dir}: wrote {len(changed)} changed team file(s), {len(all_teams) - len(changed)} unchanged.")
+
+    # --- Write the league-wide bundle (+ .gz/.br) ---
+    if _write_league_bundle(payloads, season, generated_at, out_dir):
+        changed.append("league")
+    league_name = _link_hashed(out_dir / "league.json", (".gz", ".br"))
+
+    # --- manifest.json: key -> current hashed file ---
+    teams_manifest = [dict(entry, file=hashed[entry["key"]]) for entry in teams_payload]
+    if _write_output_manifest(out_dir, season, teams_manifest, hashed, league_name, generated_at):
+        changed.append("manifest")
+    return len(changed)
+
+# ------------------------- Weekly archive -------------------------
+
+# docs/archive/<season>/: one immutable delta file per week boundary (what the
+# oracle said once that week's games were all final), a full snapshot every
+# ARCHIVE_FULL_EVERY versions, and index.json listing them. Never rewritten.
+ARCHIVE_FORMAT = "oracle-archive/1"
+ARCHIVE_FULL_EVERY = 4
+
+def _archive_dir(season, out_dir=None) -> Path:
+    return (OUT_DIR if out_dir is None else out_dir) / "archive" / str(season)
+
+def _read_archive_index(season, out_dir=None) -> dict:
+    try:
+        return json.loads((_archive_dir(season, out_dir) / "index.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"format": ARCHIVE_FORMAT, "season": season, "full_every": ARCHIVE_FULL_EVERY, "versions": []}
+
+def _archive_teams(store, all_teams, season) -> dict:
+    # {team: {"summary", "games"}} -- the team JSON minus timestamp / simulation
+    out = {}
+    for t in all_teams:
+        payload = _team_payload(t, store, season, None)
+        out[t] = {"summary": payload["summary"], "games": payload["games"]}
+    return out
+
+def _game_delta(prev, cur):
+    """Fields of cur that differ from prev (one level into "oracle"), keyed by week; None if equal."""
+    if prev is None:
+        return cur
+    d = {k: v for k, v in cur.items() if k != "oracle" and prev.get(k) != v}
+    oracle = {k: v for k, v in cur.get("oracle", {}).items() if prev.get("oracle", {}).get(k) != v}
+    if oracle:
+        d["oracle"] = oracle
+    return dict(week=cur["week"], **d) if d else None
+
+def _archive_delta(old: dict, new: dict) -> dict:
+    """Per-team changes: new summary, changed fields of new/changed games, removed game weeks."""
+    delta = {}
+    for t, cur in new.items():
+        prev = old.get(t, {"summary": None, "games": []})
+        prev_games = {g["week"]: g for g in prev["games"]}
+        cur_weeks = {g["week"] for g in cur["games"]}
+        d = {}
+        if cur["summary"] != prev["summary"]:
+            d["summary"] = cur["summary"]
+        games = [gd for gd in (_game_delta(prev_games.get(g["week"]), g) for g in cur["games"]) if gd is not None]
+        if games:
+            d["games"] = games
+        removed = sorted(w for w in prev_games if w not in cur_weeks)
+        if removed:
+            d["removed"] = removed
+        if d:
+            delta[t] = d
+    return delta
+
+def _apply_archive_delta(teams: dict, delta: dict) -> dict:
+    for t, d in delta.items():
+        cur = teams.setdefault(t, {"summary": None, "games": []})
+        games = {g["week"]: g for g in cur["games"]}
+        for w in d.get("removed", []):
+            games.pop(w, None)
+        for gd in d.get("games", []):
+            g = dict(games.get(gd["week"], {}))
+            g.update({k: v for k, v in gd.items() if k != "oracle"})
+            if "oracle" in gd:
+                g["oracle"] = dict(g.get("oracle", {}), **gd["oracle"])
+            games[gd["week"]] = g
+        cur["games"] = [games[w] for w in sorted(games)]
+        if "summary" in d:
+            cur["summary"] = d["summary"]
+    return teams
+
+def archive_view(season, as_of_week=None, out_dir=None) -> dict:
+    """
+    {team: {"summary", "games"}} as archived at the last boundary <= as_of_week
+    (latest if None): the nearest full snapshot plus the deltas after it.
+    """
+    arch = _archive_dir(season, out_dir)
+    versions = _read_archive_index(season, out_dir)["versions"]
+    if as_of_week is not None:
+        versions = [v for v in versions if v["week"] <= as_of_week]
+    if not versions:
+        raise RuntimeError(f"No archived week <= {as_of_week} for season {season} in {arch}.")
+    start = max(i for i, v in enumerate(versions) if v.get("full"))
+    teams = json.loads((arch / versions[start]["full"]).read_text(encoding="utf-8"))["teams"]
+    for v in versions[start + 1:]:
+        _apply_archive_delta(teams, json.loads((arch / v["delta"]).read_text(encoding="utf-8"))["teams"])
+    return teams
+
+def _boundary_weeks(batches):
+    """
+    0 (preseason) plus every week_num whose games, and all earlier ones, are
+    final. A game still unscored after a later week has finals (cancelled, or
+    postponed without a make-up score) is skipped so it cannot freeze the
+    archive; it stays unscored in the replay.
+    """
+    final = [~(np.isnan(batch["hs"]) | np.isnan(batch["as"])) for _, batch in batches]
+    weeks = [0]
+    for i, (week, batch) in enumerate(batches):
+        if not final[i].all():
+            if not any(f.any() for f in final[i + 1:]):
+                break
+            stale = [f"{a} @ {h}" for h, a, ok in zip(batch["home"], batch["away"], final[i]) if not ok]
+            print(f"[oracle] archive: week {week} closed with {len(stale)} unscored game(s) skipped "
+                  f"(later weeks have finals): {'; '.join(stale)}.")
+        weeks.append(week)
+    return weeks
+
+def _boundary_states(batches, fresh_state, targets):
+    """
+    Yield (week, state) for each target boundary: the season replayed through
+    that week, then every later week replayed with its scores hidden -- the
+    same reads a build run at that moment would have published.
+    """
+    targets = set(targets)
+    state = fresh_state()
+    for i in range(-1, len(batches)):
+        if i >= 0:
+            _replay_week(state, *batches[i])
+        week = 0 if i < 0 else batches[i][0]
+        if week not in targets:
+            continue
+        proj = _restore(_snapshot(state))
+        for later, batch in batches[i + 1:]:
+            hidden = np.full(len(batch["hs"]), np.nan)
+            _replay_week(proj, later, {**batch, "hs": hidden, "as": hidden})
+        yield week, proj
+
+def _pending_archive_stores(batches, season, all_teams, lookup="bucket", out_dir=None, strength="pdpg"):
+    """[(week, GameStore)] for every week boundary reached since the last archived one."""
+    versions = _read_archive_index(season, out_dir)["versions"]
+    last_week = versions[-1]["week"] if versions else -1
+    targets = [w for w in _boundary_weeks(batches) if w > last_week]
+    if not targets:
+        return []
+
+    fresh, _ = _season_start(season, all_teams, lookup, strength)
+    return [(week, state["games"]) for week, state in _boundary_states(batches, fresh, targets)]
+
+def _append_archive(season, all_teams, boundaries, out_dir=None) -> int:
+    """
+    Append a version per (week, GameStore) boundary newer than the last
+    archived week; older ones (already archived by an earlier render) are
+    skipped. Returns versions appended.
+    """
+    arch = _archive_dir(season, out_dir)
+    index = _read_archive_index(season, out_dir)
+    versions = index["versions"]
+    last_week = versions[-1]["week"] if versions else -1
+    boundaries = [(week, store) for week, store in boundaries if week > last_week]
+    if not boundaries:
+        return 0
+
+    prev = archive_view(season, out_dir=out_dir) if versions else {}
+    arch.mkdir(parents=True, exist_ok=True)
+    built_at = datetime.now(timezone.utc).isoformat()
+
+    for week, store in boundaries:
+        teams = _archive_teams(store, all_teams, season)
+        version = len(versions) + 1
+        entry = {"version": version, "week": week, "built_at": built_at,
+                 "delta": f"v{version:04d}-w{week:02d}.delta.json"}
+        body = {"format": ARCHIVE_FORMAT, "season": season, "version": version, "week": week}
+        _atomic_write_text(arch / entry["delta"], json.dumps(
+            dict(body, kind="delta", base=version - 1, teams=_archive_delta(prev, teams)), separators=(",", ":")))
+        if (version - 1) % ARCHIVE_FULL_EVERY == 0:
+            entry["full"] = f"v{version:04d}-w{week:02d}.full.json"
+            _atomic_write_text(arch / entry["full"], json.dumps(dict(body, kind="full", teams=teams), separators=(",", ":")))
+        versions.append(entry)
+        prev = teams
+
+    # index last: readers never see a version whose files are not there yet
+    _atomic_write_text(arch / "index.json", json.dumps(index, indent=2))
+    print(f"[oracle] archive {season}: appended week(s) {', '.join(str(w) for w, _ in boundaries)}.")
+    return len(boundaries)
+
+def _update_archive(sched, season, all_teams, home_col, away_col, lookup="bucket", out_dir=None, strength="pdpg") -> int:
+    """Replay and append every week boundary reached since the last archived one."""
+    batches = _week_batches(sched, home_col, away_col)
+    pending = _pending_archive_stores(batches, season, all_teams, lookup, out_dir, strength)
+    return _append_archive(season, all_teams, pending, out_dir)
+
+# --------------------------------------------------------------------------------------
+
+def _prepare_schedule(sched: pd.DataFrame, metrics=None):
+    """
+    Raw feed -> real games with an integer week_num, sorted for weekly batching.
+    Returns (sched, home_col, away_col, all_teams).
+    """
+    import pandas as pd
+    home_col = "home_score" if "home_score" in sched.columns else ("home_points" if "home_points" in sched.columns else None)
+    away_col = "away_score" if "away_score" in sched.columns else ("away_points" if "away_points" in sched.columns else None)
+    if home_col is None or away_col is None:
+        raise RuntimeError("Could not find home/away score columns in schedule data.")
+
+    # NEW: Filter + normalize week for playoff safety
+    with _span(metrics, "filter_real_games", rows_in=len(sched)) as span:
+        sched = _filter_real_games_only(sched)
+        span["rows_out"] = len(sched)
+
+    # If nothing left after filtering, fail loudly (better than silently producing empty docs)
+    if sched.empty:
+        raise RuntimeError("Schedule became empty after filtering to real NFL games. Check feed schema/columns.")
 
-def main():
-    build()
+    with _span(metrics, "derive_week_num", rows_in=len(sched)) as span:
+        # Create robust numeric week
+        sched["week_num"] = _derive_week_num(sched)
+
+        # Drop rows we cannot place on a timeline (rare, but safe)
+        sched = sched[pd.notna(sched["week_num"])].copy()
+        sched["week_num"] = sched["week_num"].astype(int)
+
+        # Sort chronologically enough for weekly batching
+        sort_cols = ["week_num"]
+        if "game_id" in sched.columns:
+            sort_cols.append("game_id")
+        sched = sched.sort_values(sort_cols).reset_index(drop=True)
+        span["rows_out"] = len(sched)
+
+    # Determine all teams in this dataset
+    all_teams = sorted(set(sched["home_team"]).union(set(sched["away_team"])))
+    return sched, home_col, away_col, all_teams
+
+# ------------------------- Stages: fetch / replay / render -------------------------
+# `all` (the default) runs the three in one process. `render` only needs the
+# persisted replay result, so output-layout or explanation changes re-render
+# docs/ without a fetch or a replay.
+
+REPLAY_FORMAT = "oracle-replay/1"
+
+def _replay_result_path(season: int) -> Path:
+    return CACHE_DIR / f"replay_{season}.pkl"
+
+def fetch(season=SEASON, offline=False, fixture=None, pbp=False, pbp_fixture=None, metrics=None):
+    """Refresh the local schedule cache (and play-by-play features). Returns the raw schedule."""
+    with _span(metrics, "fetch_schedule", offline=offline, fixture=None if fixture is None else str(fixture)) as span:
+        sched = load_schedule(season, offline=offline, fixture=fixture)
+        span["rows_out"] = len(sched)
+
+    if pbp:
+        with _span(metrics, "fetch_pbp") as span:
+            prepared, home_col, away_col, _ = _prepare_schedule(sched.copy())
+            span["team_games"] = len(load_pbp_features(season, prepared, home_col, away_col,
+                                                       offline=offline, fixture=pbp_fixture))
+    return sched
+
+def replay(season=SEASON, use_checkpoint=True, fixture=None, lookup="bucket", sim_runs=SIM_RUNS,
+           pbp=False, pbp_fixture=None, metrics=None, sched=None, strength="pdpg"):
+    """
+    Replay, simulate and collect pending archive boundaries from the fetched
+    schedule (never the network), then persist the result for render.
+    Returns the result dict.
+    """
+    if sched is None:
+        try:
+            sched = load_schedule(season, offline=True, fixture=fixture)
+        except RuntimeError:
+            raise RuntimeError(f"No fetched schedule for season {season}; run `build_data.py fetch` first.") from None
+    sched, home_col, away_col, all_teams = _prepare_schedule(sched, metrics)
+
+    checkpoint_path = _checkpoint_path(season) if use_checkpoint else None
+    with _span(metrics, "weekly_replay", games=len(sched), teams=len(all_teams)) as span:
+        state = _replay_season(sched, season, all_teams, home_col, away_col, checkpoint_path, metrics, lookup, strength)
+        span["games_played"] = int(sum(len(h) for h in state["team_games_hist"].values()) // 2)
+
+    if pbp:
+        with _span(metrics, "pbp_features") as span:
+            features = load_pbp_features(season, sched, home_col, away_col, offline=True, fixture=pbp_fixture)
+            attach_efficiency(state["games"], features)
+            span["team_games"] = len(features)
+
+    with _span(metrics, "simulate", runs=sim_runs) as span:
+        simulation = simulate_season(sched, season, all_teams, home_col, away_col, state["games"], sim_runs)
+        span["teams"] = len(simulation)
+
+    with _span(metrics, "archive_boundaries") as span:
+        archive = _pending_archive_stores(_week_batches(sched, home_col, away_col), season, all_teams, lookup,
+                                          strength=strength)
+        span["boundaries"] = len(archive)
+
+    result = {
+        "format": REPLAY_FORMAT,
+        "season": season,
+        "teams": all_teams,
+        "games": state["games"],
+        "simulation": simulation,
+        "ratings": _rating_summary(state),
+        "archive": archive,
+    }
+    _save_replay_result(result)
+    return result
+
+def _save_replay_result(result: dict):
+    # plain dicts / arrays only, so render can read it from any process
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _atomic_write_bytes(_replay_result_path(result["season"]), pickle.dumps({
+        **result,
+        "games": result["games"].to_state(),
+        "archive": [(week, store.to_state()) for week, store in result["archive"]],
+    }, protocol=pickle.HIGHEST_PROTOCOL))
+
+def _load_replay_result(season: int) -> dict:
+    try:
+        result = pickle.loads(_replay_result_path(season).read_bytes())
+    except OSError:
+        raise RuntimeError(f"No replay result for season {season} in {CACHE_DIR}; run `build_data.py replay` first.") from None
+    if result.get("format") != REPLAY_FORMAT:
+        raise RuntimeError(f"{_replay_result_path(season)} is not {REPLAY_FORMAT}; run `build_data.py replay` again.")
+    result["games"] = GameStore.from_state(result["games"])
+    result["archive"] = [(week, GameStore.from_state(d)) for week, d in result["archive"]]
+    return result
+
+def render(season=SEASON, result=None, out_dir=None, metrics=None):
+    """docs/: team files, league bundle, manifest and archive, from a replay result (default: the persisted one)."""
+    if result is None:
+        with _span(metrics, "load_replay") as span:
+            result = _load_replay_result(season)
+            span["team_games"] = len(result["games"])
+    state = {"games": result["games"], "simulation": result["simulation"], "rating_summary": result.get("ratings")}
+
+    with _span(metrics, "write_outputs", teams=len(result["teams"])) as span:
+        span["files_changed"] = _write_outputs(state, result["teams"], result["season"], out_dir)
+
+    with _span(metrics, "archive") as span:
+        span["versions_appended"] = _append_archive(result["season"], result["teams"], result["archive"], out_dir)
+
+def build(use_checkpoint=True, offline=False, fixture=None, metrics=None, season=SEASON, lookup="bucket",
+          sim_runs=SIM_RUNS, pbp=False, pbp_fixture=None, strength="pdpg"):
+    """`all`: fetch, replay and render in one process."""
+    OUT_DIR.mkdir(exist_ok=True)
+    if metrics is not None:
+        metrics.info["season"] = season
+
+    sched = fetch(season, offline=offline, fixture=fixture, pbp=pbp, pbp_fixture=pbp_fixture, metrics=metrics)
+    result = replay(season, use_checkpoint=use_checkpoint, fixture=fixture, lookup=lookup, sim_runs=sim_runs,
+                    pbp=pbp, pbp_fixture=pbp_fixture, metrics=metrics, sched=sched, strength=strength)
+    render(season, result=result, metrics=metrics)
+
+# ------------------------- Live watch mode -------------------------
+
+WATCH_INTERVAL_S = 60.0
+
+def _source_signature(fixture):
+    # Cheap change check for a local schedule drop; network sources are always refetched
+    if fixture is None:
+        return None
+    st = Path(fixture).stat()
+    return (st.st_mtime_ns, st.st_size)
+
+def _new_finals(old_batches, new_batches):
+    """game_ids / matchups whose score is present now but was not before."""
+    before = {}
+    for _, b in old_batches:
+        for gid, home, away, hs, aw in zip(b["game_id"], b["home"], b["away"], b["hs"], b["as"]):
+            before[(gid, home, away)] = not (np.isnan(hs) or np.isnan(aw))
+    finals = []
+    for _, b in new_batches:
+        for gid, home, away, hs, aw in zip(b["game_id"], b["home"], b["away"], b["hs"], b["as"]):
+            if not (np.isnan(hs) or np.isnan(aw)) and not before.get((gid, home, away), False):
+                finals.append(f"{away} {int(aw)} @ {home} {int(hs)}")
+    return finals
+
+def _changed_teams(old_store, new_store):
+    old = set(old_store.teams)
+    return [t for t in new_store.teams
+            if t not in old or old_store.team_signature(t) != new_store.team_signature(t)]
+
+def watch(interval=WATCH_INTERVAL_S, offline=False, fixture=None, season=SEASON, lookup="bucket",
+          sim_runs=SIM_RUNS, max_polls=None, metrics=None, strength="pdpg", pbp=False, pbp_fixture=None):
+    """
+    Poll the schedule source every `interval` seconds with the replay state
+    and per-week snapshots resident in memory. When a week's games or scores
+    change (e.g. a score goes from NaN to final), restore the snapshot before
+    that week and replay from there: the changed week's library reads are
+    untouched (no same-week leakage), so only its finished games' records
+    change, plus later-week reads that see the updated library and team
+    histories. Only team files whose games or simulated odds changed are
+    rewritten; the league bundle refreshes on every update. The on-disk
+    checkpoint and replay result are kept current, so the next scheduled
+    build resumes and `render` reproduces what watch last wrote.
+    """
+    resident = None     # {"teams", "batches", "snapshots", "state", "header"}
+    last_sig = object()
+    polls = updates = 0
+
+    while max_polls is None or polls < max_polls:
+        if polls:
+            time.sleep(interval)
+        polls += 1
+
+        sig = _source_signature(fixture)
+        if resident is not None and sig is not None and sig == last_sig:
+            continue
+        try:
+            sched = load_schedule(season, offline=offline, fixture=fixture)
+            sched, home_col, away_col, all_teams = _prepare_schedule(sched)
+        except Exception as e:
+            # a half-written drop or a flaky fetch: keep serving the last state
+            print(f"[oracle] watch: poll {polls} failed ({type(e).__name__}: {e}); retrying.")
+            continue
+        last_sig = sig
+        batches = _week_batches(sched, home_col, away_col)
+
+        if resident is None or resident["teams"] != all_teams:
+            fresh, prior_digest = _season_start(season, all_teams, lookup, strength)
+            header = _checkpoint_header(season, all_teams, prior_digest, lookup, strength)
+            saved = _load_checkpoint(_checkpoint_path(season), header)
+            old_store, finals = None, []
+        else:
+            header, saved, fresh = resident["header"], resident["snapshots"], resident["fresh"]
+            old_store = resident["state"]["games"]
+            finals = _new_finals(resident["batches"], batches)
+
+        t0 = time.perf_counter()
+        state, snapshots, resume = _resume_replay(batches, saved, fresh)
+        if resident is not None and resume == len(batches) == len(saved):
+            continue    # source touched, nothing in it changed
+
+        if pbp:
+            features = load_pbp_features(season, sched, home_col, away_col, offline=offline, fixture=pbp_fixture)
+            attach_efficiency(state["games"], features)
+        state["simulation"] = simulate_season(sched, season, all_teams, home_col, away_col, state["games"], sim_runs)
+        state["rating_summary"] = _rating_summary(state)
+        changed_teams = rewrite = None
+        if old_store is not None:
+            changed_teams = _changed_teams(old_store, state["games"])
+            # odds move league-wide; a file whose simulation block changed is rewritten too
+            old_sim = resident["state"].get("simulation") or {}
+            rewrite = sorted(set(changed_teams) | {t for t in all_teams if old_sim.get(t) != state["simulation"].get(t)})
+        _write_outputs(state, all_teams, season, teams=rewrite)
+        _update_archive(sched, season, all_teams, home_col, away_col, lookup, strength=strength)
+        _save_checkpoint(_checkpoint_path(season), header, snapshots)
+        _save_replay_result({"format": REPLAY_FORMAT, "season": season, "teams": all_teams, "games": state["games"],
+                             "simulation": state["simulation"], "ratings": state["rating_summary"], "archive": []})
+
+        resident = {"teams": all_teams, "batches": batches, "snapshots": snapshots, "state": state,
+                    "header": header, "fresh": fresh}
+        updates += 1
+        replayed = [week for week, _ in batches[resume:]]
+        span = f"weeks {replayed[0]}-{replayed[-1]}" if replayed else "no weeks"
+        print(f"[oracle] watch: {len(finals)} new final(s){': ' + '; '.join(finals) if finals else ''}; "
+              f"replayed {span}, {len(all_teams) if changed_teams is None else len(changed_teams)} team(s) affected "
+              f"in {time.perf_counter() - t0:.2f}s.")
+
+    if metrics is not None:
+        metrics.info["watch_polls"] = polls
+        metrics.info["watch_updates"] = updates
+
+# ------------------------- Multi-season backfill -------------------------
+
+def parse_seasons(spec: str):
+    """ "2000-2025" / "2019,2021-2023" -> sorted unique list of seasons """
+    seasons = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = (int(x) for x in part.split("-", 1))
+            if lo > hi:
+                raise ValueError(f"bad season range: {part}")
+            seasons.update(range(lo, hi + 1))
+        else:
+            seasons.add(int(part))
+    if not seasons:
+        raise ValueError(f"no seasons in {spec!r}")
+    return sorted(seasons)
+
+def _season_records_job(season, offline, fixture, strength="pdpg"):
+    """
+    Process-pool worker: everything about a season that does not depend on
+    the league library (team form, ratings, buckets, results, coherence).
+    Returns (season, all_teams, [(week, records), ...], rating summary).
+    """
+    sched = load_schedule(season, offline=offline, fixture=fixture)
+    sched, home_col, away_col, all_teams = _prepare_schedule(sched)
+    state = _new_state(season, all_teams, strength=strength)
+    weeks = [(week, _week_records(state, week, batch)) for week, batch in _week_batches(sched, home_col, away_col)]
+    return season, all_teams, weeks, _rating_summary(state)
+
+def _write_season_job(season, all_teams, store, ratings, out_dir):
+    return _write_outputs({"games": store, "rating_summary": ratings}, all_teams, season, out_dir)
+
+def backfill(seasons, offline=False, fixture=None, jobs=None, metrics=None, lookup="bucket",
+             pbp=False, pbp_fixture=None, strength="pdpg"):
+    """
+    Build several seasons with one league library that spans them:
+      1. per-season records in a process pool (independent of the library)
+      2. fold seasons in chronological order through a shared library, so each
+         season's pregame reads see every earlier season
+      3. write docs/<season>/ for each season in the pool; the current season
+         also refreshes the docs/ root the visualizer reads.
+    The library through each season is saved for later single-season builds.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    seasons = sorted(seasons)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        with _span(metrics, "season_records", seasons=len(seasons)) as span:
+            futures = [pool.submit(_season_records_job, s, offline, fixture, strength) for s in seasons]
+            season_data = [f.result() for f in futures]
+            span["games"] = sum(len(recs) // 2 for _, _, weeks, _ in season_data for _, recs in weeks)
+
+        with _span(metrics, "library_fold", seasons=len(seasons)) as span:
+            prior, _ = _load_prior_library(seasons[0] - 1, strength)
+            prior = prior or {}
+            library = prior.get("library") or BucketLibrary()
+            knn = prior.get("knn")
+            outputs = []
+            for season, all_teams, weeks, ratings in season_data:
+                state = _new_state(season, all_teams, library=library, knn=knn, lookup=lookup, strength=strength)
+                knn = state["knn"]
+                for week, records in weeks:
+                    _fold_week(state, week, records, metrics)
+                _save_prior_library(season, library, knn, strength)
+                outputs.append((season, all_teams, state["games"], ratings))
+            span["library_buckets"] = len(library)
+
+        if pbp:
+            # One season at a time: peak memory stays that of a single season
+            with _span(metrics, "pbp_features", seasons=len(seasons)) as span:
+                span["team_games"] = 0
+                for season, _, store, _ in outputs:
+                    sched, home_col, away_col, _ = _prepare_schedule(load_schedule(season, offline=offline, fixture=fixture))
+                    features = load_pbp_features(season, sched, home_col, away_col, offline=offline, fixture=pbp_fixture)
+                    attach_efficiency(store, features)
+                    span["team_games"] += len(features)
+
+        with _span(metrics, "write_outputs", seasons=len(seasons)) as span:
+            futures = [pool.submit(_write_season_job, season, all_teams, store, ratings, OUT_DIR / str(season))
+                       for season, all_teams, store, ratings in outputs]
+            if SEASON in seasons:
+                season, all_teams, store, ratings = next(o for o in outputs if o[0] == SEASON)
+                futures.append(pool.submit(_write_season_job, season, all_teams, store, ratings, OUT_DIR))
+            span["files_changed"] = sum(f.result() for f in futures)
+
+COMMANDS = ("fetch", "replay", "render", "all")
+
+def main(argv=None):
+    import argparse
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv = ["all"] + argv       # no subcommand: the one-shot build
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--manifest", type=Path, default=MANIFEST_PATH, metavar="PATH",
+                        help=f"where to write the build manifest (default: {MANIFEST_PATH})")
+    common.add_argument("--trace-memory", action="store_true",
+                        help="record tracemalloc peaks per stage (slower)")
+
+    network = argparse.ArgumentParser(add_help=False)
+    network.add_argument("--offline", action="store_true",
+                         help="build from the local schedule cache only (no network)")
+
+    source = argparse.ArgumentParser(add_help=False)
+    source.add_argument("--schedule-fixture", type=Path, default=None, metavar="PATH",
+                        help="Parquet/CSV file standing in for nflreadpy.load_schedules")
+    source.add_argument("--pbp", action="store_true",
+                        help="add per-game play-by-play efficiency (EPA/play, success rate, turnover margin); "
+                             "aggregates are cached per season in .oracle_cache/pbp/")
+    source.add_argument("--pbp-fixture", type=Path, default=None, metavar="PATH",
+                        help="local play-by-play Parquet standing in for the nflverse release (implies --pbp)")
+
+    replaying = argparse.ArgumentParser(add_help=False)
+    replaying.add_argument("--full", action="store_true",
+                           help="ignore the weekly checkpoint and replay the season from week 1")
+    replaying.add_argument("--lookup", choices=["bucket", "knn"], default="bucket",
+                           help="pregame similar-history lookup: 3-point bucket library (default) "
+                                "or distance-weighted k-NN over continuous features (needs scipy)")
+    replaying.add_argument("--strength", choices=STRENGTH_FEATURES, default="pdpg",
+                           help="team strength feature for buckets / k-NN: point differential per game (default) "
+                                "or schedule-adjusted SRS ratings, also written to the team JSON")
+    replaying.add_argument("--sim-runs", type=int, default=SIM_RUNS, metavar="N",
+                           help=f"Monte Carlo rest-of-season runs for record/playoff odds (default: {SIM_RUNS}; 0 disables)")
+    replaying.add_argument("--profile", type=Path, default=None, metavar="PATH",
+                           help="dump a cProfile of the weekly replay loop (pstats format)")
+
+    ap = argparse.ArgumentParser(description="Build the oracle JSON files under docs/.")
+    sub = ap.add_subparsers(dest="command", metavar="COMMAND")
+    sub.add_parser("fetch", parents=[common, network, source],
+                   help="refresh the local schedule (and --pbp play-by-play) cache")
+    sub.add_parser("replay", parents=[common, source, replaying],
+                   help=f"replay + simulate from the fetched data; writes {CACHE_DIR}/replay_<season>.pkl")
+    sub.add_parser("render", parents=[common],
+                   help="regenerate docs/ from the last replay result (no pandas / network)")
+    p_all = sub.add_parser("all", parents=[common, network, source, replaying],
+                           help="fetch + replay + render (the default when no command is given)")
+    p_all.add_argument("--seasons", default=None, metavar="SPEC",
+                       help="backfill several seasons with one league library, e.g. 2000-2025 "
+                            "(writes docs/<season>/; the current season also refreshes docs/)")
+    p_all.add_argument("--jobs", type=int, default=None,
+                       help="worker processes for --seasons (default: CPU count)")
+    p_all.add_argument("--watch", action="store_true",
+                       help="keep running: poll the schedule source and rewrite only teams affected by new finals")
+    p_all.add_argument("--interval", type=float, default=WATCH_INTERVAL_S, metavar="SECONDS",
+                       help=f"--watch poll interval (default: {WATCH_INTERVAL_S:g})")
+    p_all.add_argument("--as-of", type=int, default=None, metavar="WEEK",
+                       help="print the archived view as of WEEK (see docs/archive/) instead of building")
+    p_all.add_argument("--team", default=None, metavar="KEY", help="limit --as-of to one team: code or file key (e.g. GB, wsh, la)")
+    args = ap.parse_args(argv)
+
+    if getattr(args, "as_of", None) is not None:
+        view = archive_view(SEASON, args.as_of)
+        if args.team:
+            code = next((t for t in view if t.upper() == args.team.strip().upper()), None) or \
+                next((t for t in view if _alias(t) == _alias(args.team)), None)
+            if code is None:
+                ap.error(f"--team {args.team!r} is not in the week {args.as_of} archive "
+                         f"(teams: {', '.join(sorted(view))})")
+            view = {code: view[code]}
+        print(json.dumps(view, indent=2))
+        return
+
+    pbp = getattr(args, "pbp", False) or getattr(args, "pbp_fixture", None) is not None
+    metrics = BuildMetrics(trace_memory=args.trace_memory, profile_path=getattr(args, "profile", None))
+    metrics.info["command"] = args.command
+    if args.trace_memory:
+        tracemalloc.start()
+    try:
+        if args.command == "fetch":
+            fetch(offline=args.offline, fixture=args.schedule_fixture, pbp=pbp, pbp_fixture=args.pbp_fixture,
+                  metrics=metrics)
+        elif args.command == "replay":
+            replay(use_checkpoint=not args.full, fixture=args.schedule_fixture, lookup=args.lookup,
+                   sim_runs=args.sim_runs, pbp=pbp, pbp_fixture=args.pbp_fixture, metrics=metrics,
+                   strength=args.strength)
+        elif args.command == "render":
+            render(metrics=metrics)
+        elif args.watch:
+            try:
+                watch(args.interval, offline=args.offline, fixture=args.schedule_fixture, lookup=args.lookup,
+                      sim_runs=args.sim_runs, metrics=metrics, strength=args.strength, pbp=pbp,
+                      pbp_fixture=args.pbp_fixture)
+            except KeyboardInterrupt:
+                print("[oracle] watch: stopped.")
+        elif args.seasons:
+            backfill(parse_seasons(args.seasons), offline=args.offline, fixture=args.schedule_fixture,
+                     jobs=args.jobs, metrics=metrics, lookup=args.lookup, pbp=pbp, pbp_fixture=args.pbp_fixture,
+                     strength=args.strength)
+        else:
+            build(use_checkpoint=not args.full, offline=args.offline, fixture=args.schedule_fixture,
+                  metrics=metrics, lookup=args.lookup, sim_runs=args.sim_runs, pbp=pbp, pbp_fixture=args.pbp_fixture,
+                  strength=args.strength)
+    except BaseException as e:
+        metrics.write(args.manifest, status="error", error=f"{type(e).__name__}: {e}")
+        raise
+    metrics.write(args.manifest)
 
 if __name__ == "__main__":
     main()
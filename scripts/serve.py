@@ -0,0 +1,320 @@
+"""
+Optional local query server over the oracle outputs in docs/.
+
+Loads the build output once into in-memory tables indexed by team, week,
+opponent, result, reality_lock and pregame confidence, answers filtered
+queries as JSON (ETag / If-None-Match -> 304, gzip when accepted), and serves
+every docs/ file unchanged. Standard library + NumPy only.
+
+    python scripts/serve.py                        # http://127.0.0.1:8000/
+    python scripts/serve.py --port 9000 --docs docs
+
+    GET /api/games?reality_lock=DIVERGE
+    GET /api/games?min_conf=80
+    GET /api/games?team=GB,DET&result=L&min_week=10&limit=20
+    GET /api/teams
+
+Comma-separated values match any of them; different parameters must all
+match. The tables reload when docs/league.json (or teams.json) changes, so
+the server can sit next to `build_data.py --watch`.
+"""
+import argparse
+import functools
+import gzip
+import hashlib
+import json
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+DEFAULT_DOCS = Path(__file__).resolve().parent.parent / "docs"
+INDEXED = ("team", "week", "opponent", "result", "reality_lock")
+CACHE_SIZE = 2048            # cached query responses
+RELOAD_CHECK_S = 1.0         # how often the source files are stat'ed
+GZIP_MIN_BYTES = 512
+
+# ------------------------- Loading -------------------------
+
+def _decode_bundle(b: dict):
+    """league.json (oracle-league-bundle/1) -> [(team, payload)], like app.js decodeLeagueBundle."""
+    def cell(f, i):
+        c = b["columns"][f]
+        v = c["data"][i]
+        if v is None:
+            return None
+        if c["enc"] == "str":
+            return b["strings"][v]
+        if c["enc"] == "obj":
+            return b["objects"][v]
+        return v
+
+    out = []
+    for t in b["teams"]:
+        games = []
+        for i in range(t["start"], t["start"] + t["count"]):
+            g = {}
+            for f in b["fields"]:
+                if f.startswith("oracle."):
+                    g.setdefault("oracle", {})[f[7:]] = cell(f, i)
+                else:
+                    g[f] = cell(f, i)
+            games.append(g)
+        out.append((b["strings"][t["team"]], {"summary": t["summary"], "games": games}))
+    return out
+
+def load_payloads(docs: Path):
+    """[(team, payload)] from league.json, or teams.json + <key>.json when there is no bundle."""
+    league = docs / "league.json"
+    if league.exists():
+        return _decode_bundle(json.loads(league.read_text(encoding="utf-8")))
+    teams = json.loads((docs / "teams.json").read_text(encoding="utf-8"))["teams"]
+    return [(t["team"], json.loads((docs / f"{t['key']}.json").read_text(encoding="utf-8"))) for t in teams]
+
+def _source_signature(docs: Path):
+    sig = []
+    for name in ("league.json", "teams.json"):
+        try:
+            st = (docs / name).stat()
+            sig.append((name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            pass
+    return tuple(sig)
+
+# ------------------------- Indexed tables -------------------------
+
+class GameTable:
+    """
+    One row per team-game. Equality indexes map a value to a sorted int array
+    of row ids; confidence is a sorted array searched by range. A query
+    intersects the candidate arrays, smallest first.
+    """
+
+    def __init__(self, payloads):
+        self.rows = []
+        self.teams = []
+        for team, payload in payloads:
+            self.teams.append({"team": team, "summary": payload.get("summary")})
+            for g in payload.get("games", []):
+                self.rows.append(dict(team=team, **g))
+
+        self.index = {}
+        for field in INDEXED:
+            groups = {}
+            for i, r in enumerate(self.rows):
+                v = r.get(field) if field in ("team", "week", "opponent", "result") else (r.get("oracle") or {}).get(field)
+                groups.setdefault(self._key(v), []).append(i)
+            self.index[field] = {k: np.array(v, dtype=np.int64) for k, v in groups.items()}
+
+        conf = np.array([(r.get("oracle") or {}).get("pregame_confidence") for r in self.rows], dtype=float)
+        has = ~np.isnan(conf)
+        order = np.argsort(conf[has], kind="stable")
+        self.conf_values = conf[has][order]
+        self.conf_rows = np.flatnonzero(has)[order]
+        self.all_rows = np.arange(len(self.rows), dtype=np.int64)
+        self.digest = hashlib.sha256(json.dumps(self.rows, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _key(v):
+        return "null" if v is None else str(v).upper()
+
+    def query(self, params: dict):
+        """params: {field: [values]} plus min_conf / max_conf / min_week / max_week / limit."""
+        candidates = []
+        for field in INDEXED:
+            if field in params:
+                idx = self.index[field]
+                parts = [idx[k] for k in (self._key(v) for v in params[field]) if k in idx]
+                candidates.append(np.unique(np.concatenate(parts)) if parts else self.all_rows[:0])
+        if "min_conf" in params or "max_conf" in params:
+            lo = np.searchsorted(self.conf_values, float(params.get("min_conf", -np.inf)), side="left")
+            hi = np.searchsorted(self.conf_values, float(params.get("max_conf", np.inf)), side="right")
+            candidates.append(np.sort(self.conf_rows[lo:hi]))
+        if "min_week" in params or "max_week" in params:
+            lo, hi = float(params.get("min_week", -np.inf)), float(params.get("max_week", np.inf))
+            weeks = [w for w in self.index["week"] if w != "null" and lo <= float(w) <= hi]
+            parts = [self.index["week"][w] for w in weeks]
+            candidates.append(np.unique(np.concatenate(parts)) if parts else self.all_rows[:0])
+
+        if not candidates:
+            hits = self.all_rows
+        else:
+            candidates.sort(key=len)
+            hits = candidates[0]
+            for c in candidates[1:]:
+                hits = np.intersect1d(hits, c, assume_unique=True)
+        limit = int(params.get("limit", len(hits)))
+        return int(len(hits)), [self.rows[i] for i in hits[:limit].tolist()]
+
+def parse_query(qs: str) -> dict:
+    raw = parse_qs(qs, keep_blank_values=False)
+    params = {}
+    for k, vs in raw.items():
+        values = [v for part in vs for v in part.split(",") if v != ""]
+        if not values:
+            continue
+        if k in INDEXED:
+            params[k] = sorted(set(values))
+        elif k in ("min_conf", "max_conf", "min_week", "max_week"):
+            float(values[-1])                   # ValueError -> 400
+            params[k] = values[-1]
+        elif k == "limit":
+            params[k] = str(max(0, int(values[-1])))
+        else:
+            raise KeyError(k)
+    return params
+
+# ------------------------- Server -------------------------
+
+class OracleStore:
+    """Current GameTable + response cache, reloaded when the source files change."""
+
+    def __init__(self, docs: Path):
+        self.docs = docs
+        self.lock = threading.Lock()
+        self.table = None
+        self.signature = None
+        self.checked_at = 0.0
+        self.cache = OrderedDict()
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.checked_at < RELOAD_CHECK_S:
+            return
+        with self.lock:
+            self.checked_at = now
+            sig = _source_signature(self.docs)
+            if not force and sig == self.signature:
+                return
+            table = GameTable(load_payloads(self.docs))
+            self.table, self.signature = table, sig
+            self.cache.clear()
+            print(f"[serve] loaded {len(table.rows)} team-games for {len(table.teams)} teams from {self.docs}", flush=True)
+
+    def response(self, path: str, params: dict):
+        """(etag, body, gzipped body or None) for an API path, cached per canonical query."""
+        self.refresh()
+        table = self.table
+        key = (table.digest, path, json.dumps(params, sort_keys=True))
+        with self.lock:
+            hit = self.cache.get(key)
+            if hit is not None:
+                self.cache.move_to_end(key)
+                return hit
+        if path == "/api/teams":
+            payload = {"teams": table.teams}
+        else:
+            count, games = table.query(params)
+            payload = {"count": count, "returned": len(games), "games": games}
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        # data version + canonical query: identical across restarts for identical output
+        etag = 'W/"%s-%s"' % (table.digest, hashlib.sha256(repr(key[1:]).encode("utf-8")).hexdigest()[:12])
+        packed = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+        entry = (etag, body, packed)
+        with self.lock:
+            self.cache[key] = entry
+            if len(self.cache) > CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return entry
+
+class OracleHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"        # keep-alive
+    store = None
+    quiet = True
+
+    def setup(self):
+        super().setup()
+        # headers and body go out as separate writes; without this, Nagle +
+        # delayed ACK stall every keep-alive response by tens of milliseconds
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in ("/api/games", "/api/teams"):
+            return self._api(url)
+        return super().do_GET()
+
+    def do_HEAD(self):
+        # same status, ETag and Content-Length as GET, without the body
+        url = urlsplit(self.path)
+        if url.path in ("/api/games", "/api/teams"):
+            return self._api(url, head=True)
+        return super().do_HEAD()
+
+    def _send_json_error(self, status, message, head=False):
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _api(self, url, head=False):
+        try:
+            params = parse_query(url.query)
+        except KeyError as e:
+            return self._send_json_error(HTTPStatus.BAD_REQUEST, f"unknown parameter {e.args[0]!r}", head)
+        except ValueError as e:
+            return self._send_json_error(HTTPStatus.BAD_REQUEST, f"bad number: {e}", head)
+        etag, body, packed = self.store.response(url.path, params)
+
+        inm = self.headers.get("If-None-Match")
+        if inm and etag in (t.strip() for t in inm.split(",")):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        use_gzip = packed is not None and "gzip" in (self.headers.get("Accept-Encoding") or "")
+        data = packed if use_gzip else body
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+def make_server(docs=DEFAULT_DOCS, host="127.0.0.1", port=8000, quiet=True):
+    docs = Path(docs).resolve()
+    handler = functools.partial(type("Handler", (OracleHandler,), {"store": OracleStore(docs), "quiet": quiet}),
+                                directory=str(docs))
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve docs/ plus an indexed query API over the oracle outputs.")
+    ap.add_argument("--docs", type=Path, default=DEFAULT_DOCS, help=f"build output directory (default: {DEFAULT_DOCS})")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--verbose", action="store_true", help="log every request")
+    args = ap.parse_args()
+
+    server = make_server(args.docs, args.host, args.port, quiet=not args.verbose)
+    print(f"[serve] http://{args.host}:{server.server_address[1]}/  (API: /api/games, /api/teams)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
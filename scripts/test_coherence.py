@@ -0,0 +1,59 @@
+"""
+Equivalence test: coherence_streaming (RunningMoments, O(1) per game) must
+return exactly what coherence_reference (full-history z-scores) returns.
+
+    python -m pytest scripts/test_coherence.py
+    python scripts/test_coherence.py
+"""
+import sys
+
+import numpy as np
+
+import build_data as bd
+
+def _mismatches(pf_seq, pa_seq):
+    """Replay one team's games; list (game index, reference, streaming) where they differ."""
+    m_pf, m_pa = bd.RunningMoments(), bd.RunningMoments()
+    bad = []
+    for i, (pf, pa) in enumerate(zip(pf_seq, pa_seq)):
+        ref = bd.coherence_reference(pf_seq[:i], pa_seq[:i], pf, pa)
+        got = bd.coherence_streaming(m_pf, m_pa, pf, pa)
+        if ref != got:
+            bad.append((i, ref, got))
+        m_pf.push(pf)
+        m_pa.push(pa)
+    return bad
+
+def _random_scores(rng, n):
+    return [int(x) for x in rng.integers(0, 56, size=n)], [int(x) for x in rng.integers(0, 56, size=n)]
+
+def test_random_seasons():
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        pf, pa = _random_scores(rng, int(rng.integers(1, 23)))
+        assert _mismatches(pf, pa) == []
+
+def test_long_histories():
+    rng = np.random.default_rng(1)
+    for _ in range(5):
+        pf, pa = _random_scores(rng, 400)
+        assert _mismatches(pf, pa) == []
+
+def test_realistic_scores():
+    # clustered totals (field goals / touchdowns) make many repeated values
+    rng = np.random.default_rng(2)
+    for _ in range(100):
+        n = 17
+        pf = [int(3 * a + 7 * b) for a, b in zip(rng.integers(0, 4, n), rng.integers(0, 5, n))]
+        pa = [int(3 * a + 7 * b) for a, b in zip(rng.integers(0, 4, n), rng.integers(0, 5, n))]
+        assert _mismatches(pf, pa) == []
+
+def test_constant_scores():
+    # zero variance: both sides fall back to the +1e-6 guards
+    assert _mismatches([21] * 30, [17] * 30) == []
+    assert _mismatches([0] * 10, [0] * 10) == []
+    assert _mismatches([24] * 12 + [10], [20] * 12 + [45]) == []
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))